@@ -0,0 +1,10 @@
+"""
+Benchmarks for the Log Converter
+================================
+
+Synthetic wiki-log generation and throughput/memory measurements for
+ContentProcessor. Run from the repository root:
+
+    python -m benchmarks.run --sizes 10k,100k,1M
+    python -m benchmarks.generator --lines 1M --output big_log.txt
+"""
@@ -0,0 +1,111 @@
+"""
+Synthetic Wiki-Log Generator
+============================
+
+Produces realistic-looking log wikitext for benchmarking: timestamps,
+[DOIC n] scene tags, @-tagged and bracket speakers, *action* lines, DGM
+lines, bold/italic markup and HTML tags, in roughly the proportions seen in
+real event logs. Output is deterministic for a given seed.
+"""
+
+import argparse
+import random
+import sys
+from typing import Iterator
+
+from character_maps import FALLBACK_CHARACTER_CORRECTIONS, SHIP_SPECIFIC_CHARACTER_CORRECTIONS
+
+EXTRA_NAMES = ["T'Pol", "Archer", "Reyes", "Okafor", "Vance", "Serfino", "Tolenaa", "Kirra", "Doran", "Mbeki"]
+ROLES = ["Captain", "XO", "Helm", "Ops", "Science", "Medical", "Engineering", "Security"]
+WORDS = (
+    "the ship shields power hull breach sensors contact bearing course warp impulse "
+    "torpedo phaser bridge sickbay engineering captain commander ensign cadet doctor "
+    "report status we are taking heavy damage hold steady on my mark acknowledged "
+    "scanning the anomaly readings off the chart evacuate deck four now end"
+).split()
+
+def _names() -> list:
+    names = [alias.title() for alias in FALLBACK_CHARACTER_CORRECTIONS]
+    for corrections in SHIP_SPECIFIC_CHARACTER_CORRECTIONS.values():
+        names.extend(alias.title() for alias in corrections)
+    return names + EXTRA_NAMES
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(4, 18))]
+    markup = rng.random()
+    if markup < 0.08:
+        i = rng.randrange(len(words))
+        words[i] = f"'''{words[i]}'''"
+    elif markup < 0.16:
+        i = rng.randrange(len(words))
+        words[i] = f"''{words[i]}''"
+    elif markup < 0.22:
+        i = rng.randrange(len(words))
+        words[i] = f"<span style=\"color:red\">{words[i]}</span>"
+    elif markup < 0.25:
+        words.append("<br>")
+    sentence = " ".join(words)
+    return sentence[0].upper() + sentence[1:] + rng.choice([".", "!", "?", "..."])
+
+def iter_log_lines(num_lines: int, seed: int = 0) -> Iterator[str]:
+    """Yields num_lines synthetic log lines (without newlines)."""
+    rng = random.Random(seed)
+    names = _names()
+    minute = 0
+    scene = "1"
+    for _ in range(num_lines):
+        minute += rng.random() < 0.3
+        timestamp = f"[{(minute // 60) % 24:02d}:{minute % 60:02d}] " if rng.random() < 0.9 else ""
+        if rng.random() < 0.02:
+            scene = rng.choice("123456")
+        tag = f"[DOIC{scene}] " if rng.random() < 0.85 else ""
+        kind = rng.random()
+        if kind < 0.03:
+            yield ""
+            continue
+        if kind < 0.35:
+            body = f"{rng.choice(names)}@{rng.choice(ROLES)}: {_sentence(rng)}"
+        elif kind < 0.55:
+            body = f"{rng.choice(names)}: {_sentence(rng)}"
+        elif kind < 0.65:
+            body = f"[{rng.choice(names)}] {_sentence(rng)}"
+        elif kind < 0.78:
+            body = f"*{_sentence(rng).rstrip('.!?')}*"
+        elif kind < 0.85:
+            body = f"DGM@Game: *{_sentence(rng).rstrip('.!?')}*" if rng.random() < 0.5 else f"DGM: {_sentence(rng)}"
+        elif kind < 0.93:
+            # Setting blocks narrated under a bare [DOIC] tag
+            tag = "[DOIC] "
+            body = rng.choice([f"{rng.choice(names)}@{rng.choice(ROLES)}: ", "*", ""]) + _sentence(rng)
+        else:
+            body = _sentence(rng)
+        yield f"{timestamp}{tag}{body}"
+
+def generate_log(num_lines: int, seed: int = 0) -> str:
+    """Returns num_lines synthetic log lines as one wikitext string."""
+    return "\n".join(iter_log_lines(num_lines, seed))
+
+def parse_size(text: str) -> int:
+    """Parses sizes such as 10000, 10k or 10M."""
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic wiki log for benchmarking.")
+    parser.add_argument("--lines", default="100k", help="Number of lines, e.g. 10k or 10M (default: 100k).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+    parser.add_argument("--output", help="Output file (default: stdout).")
+    args = parser.parse_args()
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for line in iter_log_lines(parse_size(args.lines), args.seed):
+            out.write(line)
+            out.write("\n")
+    finally:
+        if args.output:
+            out.close()
+
+if __name__ == "__main__":
+    main()
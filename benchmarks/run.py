@@ -0,0 +1,199 @@
+"""
+Throughput and Memory Benchmarks
+================================
+
+Measures lines/sec and peak memory of ContentProcessor.process_log_content
+and of each processing stage on synthetic logs, and flags regressions
+against a stored baseline.
+
+Each log is generated straight to a temporary file and the streaming stage
+reads it back through the memory-mapped line reader, so even 10M-line runs
+stay within a few hundred MB. The whole-string process_log_content stage only
+runs up to IN_MEMORY_MAX_LINES, and the per-stage measurements (lexing,
+speaker resolution, cleanup) use the first STAGE_SAMPLE_LINES lines.
+
+    python -m benchmarks.run --sizes 10k,100k          # measure and compare
+    python -m benchmarks.run --sizes 10k,100k --save-baseline
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+from typing import Callable, Dict, List
+
+from benchmarks.generator import iter_log_lines, parse_size
+from character_maps import resolve_character_name_with_context
+from log_converter import ContentProcessor, iter_file_lines
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+BENCH_TITLE = "USS Stardancer - Benchmark Log"
+# Larger logs skip the stage that needs the whole log as one string
+IN_MEMORY_MAX_LINES = 1_000_000
+# The per-stage measurements run on at most this many lines of each log
+STAGE_SAMPLE_LINES = 100_000
+
+def _write_log(path: str, size: int, seed: int) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in iter_log_lines(size, seed):
+            f.write(line)
+            f.write("\n")
+
+def _stage_inputs(processor: ContentProcessor, log_path: str) -> Dict[str, list]:
+    """Prepares the per-stage inputs from a sample of the log, outside the timed region."""
+    ship_context = processor._get_ship_context(BENCH_TITLE)
+    sample = islice(iter_file_lines(log_path), STAGE_SAMPLE_LINES)
+    stripped = [line.strip() for line in sample if line.strip()]
+    lexed = [processor._lex_line(line, ship_context) for line in stripped]
+    speakers = [speaker.split('@')[0].strip() for _, _, _, speaker, _ in lexed]
+    return {
+        'stripped': stripped,
+        'speakers': [speaker for speaker in speakers if speaker and "DGM" not in speaker],
+        'bodies': [body for _, _, _, _, body in lexed],
+        'ship_context': ship_context,
+    }
+
+def _stages(processor: ContentProcessor, log_path: str, size: int) -> Dict[str, Callable[[], int]]:
+    """Returns the benchmarked callables; each returns the number of lines it handled."""
+    inputs = _stage_inputs(processor, log_path)
+    ship_context = inputs['ship_context']
+
+    def full():
+        with open(log_path, 'r', encoding='utf-8') as f:
+            wikitext = f.read()
+        processor.process_log_content(BENCH_TITLE, wikitext)
+        return size
+
+    def streaming():
+        count = 0
+        for _ in processor.iter_processed_lines(BENCH_TITLE, iter_file_lines(log_path)):
+            count += 1
+        return count
+
+    def lex():
+        lex_line = processor._lex_line
+        for line in inputs['stripped']:
+            lex_line(line, ship_context)
+        return len(inputs['stripped'])
+
+    def resolve():
+        for speaker in inputs['speakers']:
+            resolve_character_name_with_context(speaker, ship_context)
+        return len(inputs['speakers'])
+
+    def cleanup():
+        cleanup_line = processor._cleanup_line
+        for body in inputs['bodies']:
+            cleanup_line(body)
+        return len(inputs['bodies'])
+
+    stages = {
+        'process_log_content': full,
+        'iter_processed_lines': streaming,
+        'lex_line': lex,
+        'resolve_speaker': resolve,
+        'cleanup_line': cleanup,
+    }
+    if size > IN_MEMORY_MAX_LINES:
+        del stages['process_log_content']
+    return stages
+
+def _measure(func: Callable[[], int], repeat: int, memory: bool) -> Dict[str, float]:
+    """Times func (best of repeat) and optionally records its peak allocation."""
+    best = float('inf')
+    lines = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        lines = func()
+        best = min(best, time.perf_counter() - start)
+    result = {'seconds': best, 'lines': lines, 'lines_per_sec': lines / best if best else 0.0}
+    if memory:
+        # Measured in a separate pass: tracemalloc slows the code it watches
+        gc.collect()
+        tracemalloc.start()
+        func()
+        result['peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result
+
+def run_benchmarks(sizes: List[int], repeat: int = 3, memory: bool = True, seed: int = 0) -> Dict[str, dict]:
+    """Runs every stage at every size; returns {"<size>/<stage>": measurement}."""
+    processor = ContentProcessor()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="logconvert-bench-") as temp_dir:
+        for size in sizes:
+            log_path = os.path.join(temp_dir, f"log-{size}.txt")
+            _write_log(log_path, size, seed)
+            for stage, func in _stages(processor, log_path, size).items():
+                key = f"{size}/{stage}"
+                results[key] = _measure(func, repeat, memory)
+                _print_row(key, results[key])
+            os.remove(log_path)
+    return results
+
+def _print_row(key: str, result: Dict[str, float]) -> None:
+    peak = f"{result['peak_mb']:10.1f} MB" if 'peak_mb' in result else ""
+    print(f"{key:<34} {result['lines_per_sec']:>14,.0f} lines/s {result['seconds']:9.3f} s{peak}")
+
+def compare_to_baseline(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Returns a message for every measurement that regressed beyond tolerance."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if not reference:
+            continue
+        if result['lines_per_sec'] < reference['lines_per_sec'] * (1 - tolerance):
+            change = result['lines_per_sec'] / reference['lines_per_sec'] - 1
+            regressions.append(f"{key}: throughput {change:+.1%} "
+                               f"({result['lines_per_sec']:,.0f} vs {reference['lines_per_sec']:,.0f} lines/s)")
+        if 'peak_mb' in result and 'peak_mb' in reference and result['peak_mb'] > reference['peak_mb'] * (1 + tolerance):
+            change = result['peak_mb'] / reference['peak_mb'] - 1
+            regressions.append(f"{key}: peak memory {change:+.1%} "
+                               f"({result['peak_mb']:.1f} vs {reference['peak_mb']:.1f} MB)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the log converter on synthetic logs.")
+    parser.add_argument("--sizes", default="10k,100k",
+                        help="Comma-separated line counts, e.g. 10k,100k,1M,10M (default: 10k,100k).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement; best is kept (default: 3).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic log (default: 0).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file (default: benchmarks/baseline.json).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed slowdown/memory growth before flagging a regression (default: 0.10).")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    print(f"Python {platform.python_version()} on {platform.platform()}")
+    results = run_benchmarks(sizes, repeat=args.repeat, memory=not args.no_memory, seed=args.seed)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline stored yet; run with --save-baseline to create one.")
+        return
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("REGRESSIONS:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -33,6 +33,7 @@ def build_executable():
         '--name=logconvert-cli',  # Name the executable
         '--console',  # Keep console window for command-line usage
         '--add-data=character_maps.py;.',  # Include character_maps.py
+        '--add-data=character_maps.json;.',  # Include the character data file
         'log_converter.py'  # Main script
     ]
     
@@ -44,6 +45,7 @@ def build_executable():
         '--name=logconvert-gui',  # Name the executable
         '--console',  # Keep console window for debugging
         '--add-data=character_maps.py;.',  # Include character_maps.py
+        '--add-data=character_maps.json;.',  # Include the character data file
         'gui_converter.py'  # GUI script
     ]
     
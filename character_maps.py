@@ -1,117 +1,281 @@
 """
-Character Mappings and Resolution for DB Populator
-==================================================
+Character Mappings and Resolution
+=================================
 
-This module contains a local copy of log-related patterns and functions
-required by the db_populator. This avoids cross-container dependencies
-by making the populator self-sufficient.
+Resolves speaker names to full character names, using the ship named in the
+page title and, for a few ambiguous names, the surrounding text. The maps
+themselves are data: they are read from character_maps.json through
+character_store.py, so this module needs both next to it (or
+LOGCONVERT_CHARACTER_MAPS pointing at the data file), and they are reloaded
+when the file changes.
 """
 
+import hashlib
+import json
+import logging
 import re
-from typing import Optional, Dict, List
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple
+
+from character_store import CharacterStore
+
+if TYPE_CHECKING:
+    from fuzzy_names import TrigramIndex
+
+# The maps are loaded from character_maps.json (see character_store.py).
+# These module-level objects are updated in place when the file is reloaded,
+# so references imported elsewhere stay current.
+_store = CharacterStore()
+_store.load()
 
 # Ship-specific character mappings for disambiguation
-SHIP_SPECIFIC_CHARACTER_CORRECTIONS = {
-    'stardancer': {
-        'tolena': 'Ensign Maeve Blaine',
-        'maeve tolena': 'Ensign Maeve Blaine',
-        'maeve tolena blaine': 'Ensign Maeve Blaine',
-        'maeve': 'Ensign Maeve Blaine',
-        'marcus': 'Captain Marcus Blaine',
-        'captain blaine': 'Captain Marcus Blaine',
-    },
-    'protector': {
-        'tolena': 'Doctor t\'Lena',
-        't\'lena': 'Doctor t\'Lena',
-        'tlena': 'Doctor t\'Lena',
-        'doctor tolena': 'Doctor t\'Lena',
-        'dr tolena': 'Doctor t\'Lena',
-    },
-    'manta': {
-        'tolena': 'Doctor t\'Lena',
-        't\'lena': 'Doctor t\'Lena',
-        'tlena': 'Doctor t\'Lena',
-        'doctor tolena': 'Doctor t\'Lena',
-        'dr tolena': 'Doctor t\'Lena',
-    },
-    'pilgrim': {
-        'tolena': 'Doctor t\'Lena',
-        't\'lena': 'Doctor t\'Lena',
-        'tlena': 'Doctor t\'Lena',
-        'doctor tolena': 'Doctor t\'Lena',
-        'dr tolena': 'Doctor t\'Lena',
-       
-    },
-    'adagio': {
-        'Eren': 'Sereya Eren',
-        'Sereya': 'Sereya Eren',
-        'Talia':'Captain Talia',
-        'Campbell':'Conor Campbell',
-
-        
+SHIP_SPECIFIC_CHARACTER_CORRECTIONS: Dict[str, Dict[str, str]] = _store.ship_corrections
+# Ship names recognised in page titles; earlier entries win
+FLEET_SHIP_NAMES: List[str] = _store.fleet_ship_names
+# Fallback character corrections when ship context is unknown
+FALLBACK_CHARACTER_CORRECTIONS: Dict[str, str] = _store.fallback_corrections
+
+class SubstringMatcher:
+    """Finds which of a fixed set of lower-case substrings occur in a text in one scan.
+
+    All needles go into a single compiled alternation, longest first, wrapped
+    in a lookahead so a match is tried at every position. A needle that is a
+    prefix of a longer one found at the same position is reported as well.
+    """
+
+    def __init__(self, needles: List[str]):
+        self.needles = list(dict.fromkeys(needle.lower() for needle in needles))
+        ordered = sorted(self.needles, key=len, reverse=True)
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(needle) for needle in ordered) + '))')
+        self._implied = {
+            needle: [other for other in self.needles if needle.startswith(other)]
+            for needle in self.needles
+        }
+
+    def find_all(self, text_lower: str) -> set:
+        """Returns the set of needles that occur anywhere in text_lower."""
+        found = set()
+        if not text_lower:
+            return found
+        for match in self._pattern.finditer(text_lower):
+            found.update(self._implied[match.group(1)])
+        return found
+
+# Context words that tip an ambiguous name one way or the other
+TOLENA_STARDANCER_INDICATORS = ['ensign', 'cadet', 'maeve', 'daughter', 'blaine']
+TOLENA_DOCTOR_INDICATORS = ['doctor', 'dr.', 'medical', 'sickbay', 'patient', 'treatment']
+BLAINE_CAPTAIN_INDICATORS = ['captain', 'commanding officer', 'co', 'bridge', 'command']
+BLAINE_ENSIGN_INDICATORS = ['ensign', 'cadet', 'maeve', 'tolena', 'daughter']
+
+_TOLENA_MATCHER = SubstringMatcher(TOLENA_STARDANCER_INDICATORS + TOLENA_DOCTOR_INDICATORS)
+_BLAINE_MATCHER = SubstringMatcher(BLAINE_CAPTAIN_INDICATORS + BLAINE_ENSIGN_INDICATORS)
+
+# Ship names are matched in one scan of the title; when several occur, the
+# one listed first in FLEET_SHIP_NAMES wins, as it always has.
+def _build_fleet_matcher(fleet_ship_names: List[str]) -> Tuple[SubstringMatcher, Dict[str, int]]:
+    priority = {}
+    for index, ship_name in enumerate(fleet_ship_names):
+        priority.setdefault(ship_name.lower(), index)
+    return SubstringMatcher(fleet_ship_names), priority
+
+# The resolver reads only these private copies, never the public dicts above.
+# A reload builds new copies first and swaps them in under _reload_lock, so a
+# name resolved on another thread meanwhile sees the old maps or the new ones,
+# never a half-filled dict. Tables are built and cached under the same lock,
+# so a table built from the old maps cannot be cached after a reload.
+_reload_lock = threading.RLock()
+_fleet = _build_fleet_matcher(FLEET_SHIP_NAMES)
+_fallback_corrections: Dict[str, str] = dict(FALLBACK_CHARACTER_CORRECTIONS)
+
+def find_ship_context(title: str) -> str:
+    """Returns the ship context (e.g. 'stardancer') named in a page title, or ''."""
+    fleet_matcher, fleet_priority = _fleet
+    hits = fleet_matcher.find_all(title.lower())
+    if not hits:
+        return ""
+    return min(hits, key=fleet_priority.__getitem__).replace('uss ', '')
+
+# Names whose resolution can depend on the surrounding text, and the full
+# names _resolve_ambiguous_name can give them
+AMBIGUOUS_NAMES = ('tolena', 'blaine')
+AMBIGUOUS_FULL_NAMES = ('Ensign Maeve Blaine', 'Doctor t\'Lena', 'Captain Marcus Blaine')
+
+# --- Precompiled resolution index ---
+# For each ship context, the ship-specific corrections, the context-free
+# answer for the ambiguous names and the fallback corrections are merged into
+# one flat table at build time, so resolving a name is a single dict lookup.
+_MAX_RESOLUTION_TABLES = 256
+_resolution_tables: Dict[Optional[str], Dict[str, str]] = {}
+
+def _normalize_ship_corrections(ship_corrections: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Lower-cases every ship-specific alias (e.g. the mixed-case adagio keys)."""
+    return {
+        ship.lower(): {alias.lower().strip(): full_name for alias, full_name in corrections.items()}
+        for ship, corrections in ship_corrections.items()
     }
-}
-FLEET_SHIP_NAMES = [
-    'stardancer', 'USS Stardancer', 'protector', 'USS Protector', 'manta', 'USS Manta',
-    'pilgrim', 'USS Pilgrim', 'gigantes', 'mjolnir', 'adagio', 'USS Adagio',
-    'caelian', 'USS Caelian', 'mjolnir', 'USS Mjolnir', 'gigantes', 'USS Gigantes',
-]
 
-# Fallback character corrections when ship context is unknown
-FALLBACK_CHARACTER_CORRECTIONS = {
-    'marcus blaine': 'Captain Marcus Blaine',
-    'captain marcus blaine': 'Captain Marcus Blaine',
-    'maeve blaine': 'Ensign Maeve Blaine',
-    'maeve tolena blaine': 'Ensign Maeve Blaine',
-    'ensign maeve blaine': 'Ensign Maeve Blaine',
-    'doctor t\'lena': 'Doctor t\'Lena',
-    'serafino': 'Commander Serafino',
-    'doctor serafino': 'Commander Serafino',
-    'ankos': 'Doctor Ankos',
-    'sif': 'Commander Sif',
-    'zhal': 'Commander Zhal',
-    'eren': 'Captain Sereya Eren',
-    'sereya eren': 'Captain Sereya Eren',
-    'dryellia': 'Cadet Dryellia',
-    'zarina dryellia': 'Cadet Zarina Dryellia',
-    'zarina': 'Cadet Zarina Dryellia',
-    'alemyn': 'Surithrae Alemyn',
-    'snow': 'Cadet Snow',
-    'rigby': 'Cadet Rigby',
-    'scarlett': 'Cadet Scarlett',
-    'bethany scarlett': 'Cadet Bethany Scarlett',
-    'antony': 'Cadet Antony',
-    'finney': 'Cadet Finney',
-    'schwarzweld': 'Cadet Hedwik Schwarzweld',
-    'kodor': 'Cadet Kodor',
-    'vrajen kodor': 'Cadet Vrajen Kodor',
-    'vrajen': 'Cadet Vrajen Kodor',
-    'tavi': 'Cadet Antony'
-}
+_normalized_ship_corrections = _normalize_ship_corrections(SHIP_SPECIFIC_CHARACTER_CORRECTIONS)
+
+def _swap_in_maps(ship_corrections: Dict[str, Dict[str, str]], fallback_corrections: Dict[str, str],
+                  fleet_ship_names: List[str]) -> None:
+    """Builds the resolver's copies of the given maps, then replaces the current ones."""
+    global _normalized_ship_corrections, _fallback_corrections, _fleet
+    normalized = _normalize_ship_corrections(ship_corrections)
+    fallback = dict(fallback_corrections)
+    fleet = _build_fleet_matcher(list(fleet_ship_names))
+    with _reload_lock:
+        _normalized_ship_corrections, _fallback_corrections, _fleet = normalized, fallback, fleet
+        _resolution_tables.clear()
+        _fuzzy_indexes.clear()
+        _fuzzy_memo.clear()
+        _capitalize_name.cache_clear()
+
+def rebuild_resolution_index() -> None:
+    """Rebuilds the resolution tables after the correction dicts are edited at runtime."""
+    with _reload_lock:
+        _swap_in_maps(SHIP_SPECIFIC_CHARACTER_CORRECTIONS, FALLBACK_CHARACTER_CORRECTIONS, FLEET_SHIP_NAMES)
+
+# --- Hot reload ---
+def reload_character_maps(force: bool = False) -> bool:
+    """Re-reads the character data file if it changed on disk (or always, with force).
+
+    Returns True when new maps were loaded. A file that cannot be read or
+    parsed is reported once and the current maps stay in use.
+    """
+    if not force and not _store.changed():
+        return False
+    with _reload_lock:
+        if not force and not _store.changed():
+            return False
+        try:
+            _store.load()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Keeping the current character maps; could not reload '{_store.path}': {e}")
+            return False
+        _swap_in_maps(_store.ship_corrections, _store.fallback_corrections, _store.fleet_ship_names)
+        # The public dicts are refilled in place so references imported elsewhere stay current
+        SHIP_SPECIFIC_CHARACTER_CORRECTIONS.clear()
+        SHIP_SPECIFIC_CHARACTER_CORRECTIONS.update(_store.ship_corrections)
+        FALLBACK_CHARACTER_CORRECTIONS.clear()
+        FALLBACK_CHARACTER_CORRECTIONS.update(_store.fallback_corrections)
+        FLEET_SHIP_NAMES[:] = _store.fleet_ship_names
+    logging.info(f"Reloaded character maps from '{_store.path}'")
+    return True
+
+def _build_resolution_table(ship_key: str) -> Dict[str, str]:
+    """Builds the flattened alias -> name table for one (lower-cased) ship context."""
+    table = dict(_fallback_corrections)
+    for ambiguous_name in AMBIGUOUS_NAMES:
+        resolved_name = _resolve_ambiguous_name(ambiguous_name, ship_key, "")
+        if resolved_name:
+            table[ambiguous_name] = resolved_name
+    table.update(_normalized_ship_corrections.get(ship_key, {}))
+    return table
+
+def _get_resolution_table(ship_context: Optional[str]) -> Dict[str, str]:
+    """Returns the resolution table for a ship context, building it on first use."""
+    table = _resolution_tables.get(ship_context)
+    if table is not None:
+        return table
+    with _reload_lock:
+        ship_key = ship_context.lower() if ship_context else ''
+        table = _resolution_tables.get(ship_key)
+        if table is None:
+            table = _build_resolution_table(ship_key)
+        if len(_resolution_tables) < _MAX_RESOLUTION_TABLES:
+            _resolution_tables[ship_key] = table
+            _resolution_tables[ship_context] = table
+    return table
+
+# --- Fuzzy fallback ---
+# Optional: names with no exact alias are matched against the aliases and
+# full names known for their ship context before falling back to plain
+# capitalization. Off by default, since it can rename a genuinely new
+# character whose name happens to resemble a known one.
+DEFAULT_FUZZY_THRESHOLD = 0.85
+FUZZY_MIN_LENGTH = 4
+_MAX_FUZZY_MEMO = 65536
+_fuzzy_threshold: Optional[float] = None
+_fuzzy_indexes: Dict[str, 'TrigramIndex'] = {}
+_fuzzy_memo: Dict[Tuple[str, str], Optional[str]] = {}
+
+def set_fuzzy_matching(threshold: Optional[float]) -> None:
+    """Turns the fuzzy fallback on with a similarity threshold in (0, 1], or off with None."""
+    global _fuzzy_threshold
+    if threshold is not None and not 0 < threshold <= 1:
+        raise ValueError(f"fuzzy threshold must be in (0, 1], got {threshold}")
+    _fuzzy_threshold = threshold
+    _fuzzy_memo.clear()
+
+def _fuzzy_resolve(name_lower: str, ship_context: Optional[str]) -> Optional[str]:
+    """Returns the character a mistyped name most likely means in this ship context, or None."""
+    ship_key = ship_context.lower() if ship_context else ''
+    memo_key = (ship_key, name_lower)
+    if memo_key in _fuzzy_memo:
+        return _fuzzy_memo[memo_key]
+    with _reload_lock:
+        index = _fuzzy_indexes.get(ship_key)
+        if index is None:
+            from fuzzy_names import TrigramIndex
+            table = _get_resolution_table(ship_key)
+            names = {full_name.lower(): full_name for full_name in table.values()}
+            names.update(table)
+            index = _fuzzy_indexes[ship_key] = TrigramIndex(names)
+        resolved_name = index.match(name_lower, _fuzzy_threshold)
+        if len(_fuzzy_memo) >= _MAX_FUZZY_MEMO:
+            _fuzzy_memo.clear()
+        _fuzzy_memo[memo_key] = resolved_name
+    return resolved_name
+
+def known_character_names() -> set:
+    """Returns every full name the character maps can resolve a speaker to."""
+    with _reload_lock:
+        names = set(FALLBACK_CHARACTER_CORRECTIONS.values())
+        for corrections in SHIP_SPECIFIC_CHARACTER_CORRECTIONS.values():
+            names.update(corrections.values())
+    names.update(AMBIGUOUS_FULL_NAMES)
+    return names
+
+def character_maps_version() -> str:
+    """Returns a hash of every character map that affects resolution output."""
+    with _reload_lock:
+        payload = json.dumps(
+            [SHIP_SPECIFIC_CHARACTER_CORRECTIONS, FALLBACK_CHARACTER_CORRECTIONS, FLEET_SHIP_NAMES],
+            sort_keys=True, ensure_ascii=False
+        )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+@lru_cache(maxsize=4096)
+def _capitalize_name(name: str) -> str:
+    return ' '.join(word.capitalize() for word in name.split())
 
 def resolve_character_name_with_context(name: str, ship_context: Optional[str] = None, surrounding_text: str = "") -> str:
     if not name:
         return name
     name_lower = name.lower().strip()
-    surrounding_lower = surrounding_text.lower()
-    if ship_context and ship_context.lower() in SHIP_SPECIFIC_CHARACTER_CORRECTIONS:
-        ship_corrections = SHIP_SPECIFIC_CHARACTER_CORRECTIONS[ship_context.lower()]
-        if name_lower in ship_corrections:
-            return ship_corrections[name_lower]
-    if name_lower in ['tolena', 'blaine']:
-        resolved_name = _resolve_ambiguous_name(name_lower, ship_context, surrounding_lower)
-        if resolved_name:
+    if surrounding_text and name_lower in AMBIGUOUS_NAMES:
+        ship_key = ship_context.lower() if ship_context else ''
+        if name_lower not in _normalized_ship_corrections.get(ship_key, {}):
+            # Only this branch looks at the surrounding text
+            resolved_name = _resolve_ambiguous_name(name_lower, ship_context, surrounding_text.lower())
+            if resolved_name:
+                return resolved_name
+            return _fallback_corrections.get(name_lower) or _capitalize_name(name)
+    resolved_name = _get_resolution_table(ship_context).get(name_lower)
+    if resolved_name is not None:
+        return resolved_name
+    if _fuzzy_threshold is not None and len(name_lower) >= FUZZY_MIN_LENGTH:
+        resolved_name = _fuzzy_resolve(name_lower, ship_context)
+        if resolved_name is not None:
             return resolved_name
-    if name_lower in FALLBACK_CHARACTER_CORRECTIONS:
-        return FALLBACK_CHARACTER_CORRECTIONS[name_lower]
-    return ' '.join(word.capitalize() for word in name.split())
+    return _capitalize_name(name)
 
 def _resolve_ambiguous_name(name_lower: str, ship_context: Optional[str], surrounding_lower: str) -> Optional[str]:
     if name_lower == 'tolena':
-        stardancer_indicators = ['ensign', 'cadet', 'maeve', 'daughter', 'blaine']
-        doctor_indicators = ['doctor', 'dr.', 'medical', 'sickbay', 'patient', 'treatment']
-        stardancer_score = sum(1 for indicator in stardancer_indicators if indicator in surrounding_lower)
-        doctor_score = sum(1 for indicator in doctor_indicators if indicator in surrounding_lower)
+        found = _TOLENA_MATCHER.find_all(surrounding_lower)
+        stardancer_score = sum(1 for indicator in TOLENA_STARDANCER_INDICATORS if indicator in found)
+        doctor_score = sum(1 for indicator in TOLENA_DOCTOR_INDICATORS if indicator in found)
         if stardancer_score > doctor_score:
             return 'Ensign Maeve Blaine'
         elif doctor_score > stardancer_score:
@@ -123,10 +287,9 @@ def _resolve_ambiguous_name(name_lower: str, ship_context: Optional[str], surrou
                 return 'Doctor t\'Lena'
         return None
     elif name_lower == 'blaine':
-        captain_indicators = ['captain', 'commanding officer', 'co', 'bridge', 'command']
-        ensign_indicators = ['ensign', 'cadet', 'maeve', 'tolena', 'daughter']
-        captain_score = sum(1 for indicator in captain_indicators if indicator in surrounding_lower)
-        ensign_score = sum(1 for indicator in ensign_indicators if indicator in surrounding_lower)
+        found = _BLAINE_MATCHER.find_all(surrounding_lower)
+        captain_score = sum(1 for indicator in BLAINE_CAPTAIN_INDICATORS if indicator in found)
+        ensign_score = sum(1 for indicator in BLAINE_ENSIGN_INDICATORS if indicator in found)
         if captain_score > ensign_score:
             return 'Captain Marcus Blaine'
         elif ensign_score > captain_score:
@@ -134,4 +297,4 @@ def _resolve_ambiguous_name(name_lower: str, ship_context: Optional[str], surrou
         elif ship_context and ship_context.lower() == 'stardancer':
             return 'Captain Marcus Blaine'
         return None
-    return None 
\ No newline at end of file
+    return None
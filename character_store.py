@@ -0,0 +1,84 @@
+"""
+Character Map Store
+===================
+
+The character maps (ship-specific corrections, fallback corrections and the
+fleet ship names) live in a JSON data file rather than in Python literals,
+so the roster can grow to thousands of aliases without touching code.
+character_maps.py flattens them into one alias table per ship, which is the
+(ship, alias) index the resolver looks names up in.
+
+The store remembers the file's modification time and size. Long-running
+processes ask it between pages whether the file changed and reload it
+in place, so edits take effect without a restart.
+"""
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+CHARACTER_MAPS_FILE = "character_maps.json"
+# Points every process at a shared data file instead of the bundled one
+CHARACTER_MAPS_ENV = "LOGCONVERT_CHARACTER_MAPS"
+
+def default_character_maps_path() -> str:
+    """Returns the data file to use: $LOGCONVERT_CHARACTER_MAPS, the bundled copy, or the installed one."""
+    configured = os.environ.get(CHARACTER_MAPS_ENV)
+    if configured:
+        return os.path.expanduser(configured)
+    bundled = os.path.join(os.path.dirname(os.path.abspath(__file__)), CHARACTER_MAPS_FILE)
+    installed = os.path.join(sys.prefix, 'share', 'logconvert', CHARACTER_MAPS_FILE)
+    if not os.path.exists(bundled) and os.path.exists(installed):
+        return installed
+    return bundled
+
+def _string_map(value, what: str) -> Dict[str, str]:
+    if not isinstance(value, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in value.items()):
+        raise ValueError(f"{what} must map alias strings to name strings")
+    return value
+
+class CharacterStore:
+    """The character maps read from one data file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_character_maps_path()
+        self.ship_corrections: Dict[str, Dict[str, str]] = {}
+        self.fallback_corrections: Dict[str, str] = {}
+        self.fleet_ship_names: List[str] = []
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> None:
+        """Reads the data file; raises OSError or ValueError if it is missing or malformed."""
+        # Stamped before reading, so a failed load is not retried until the
+        # file changes again and an edit made mid-read is picked up next time
+        self._stamp = self._stat()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+
+        ship_corrections = data.get('ship_corrections', {})
+        if not isinstance(ship_corrections, dict):
+            raise ValueError("ship_corrections must map ship names to alias maps")
+        for ship, corrections in ship_corrections.items():
+            _string_map(corrections, f"ship_corrections['{ship}']")
+        fallback_corrections = _string_map(data.get('fallback_corrections', {}), "fallback_corrections")
+        fleet_ship_names = data.get('fleet_ship_names', [])
+        if not isinstance(fleet_ship_names, list) or not all(isinstance(name, str) for name in fleet_ship_names):
+            raise ValueError("fleet_ship_names must be a list of strings")
+
+        self.ship_corrections = ship_corrections
+        self.fallback_corrections = fallback_corrections
+        self.fleet_ship_names = fleet_ship_names
+
+    def changed(self) -> bool:
+        """Returns True if the file was modified, replaced or removed since the last load."""
+        return self._stat() != self._stamp
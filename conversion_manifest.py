@@ -0,0 +1,105 @@
+"""
+Conversion Manifest for Incremental Batch Runs
+==============================================
+
+Remembers, for every converted input file, the hash of its content, the
+version hash of the character maps and the processor version it was
+converted with. A batch run can then skip every input whose combination is
+unchanged and only reconvert what an edit actually affects.
+
+The manifest is a JSON file kept in the output directory. Entries are keyed
+by the input path relative to the input directory together with the output
+path relative to the output directory, so text, jsonl and sqlite outputs of
+the same input are tracked separately.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+MANIFEST_NAME = '.logconvert-manifest.json'
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Returns the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ConversionManifest:
+    """Tracks which inputs are already converted with the current maps and processor."""
+
+    def __init__(self, path: str, processor_version: str, maps_version: str):
+        self.path = path
+        self.processor_version = processor_version
+        self.maps_version = maps_version
+        self.entries: Dict[str, dict] = {}
+        self._dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('entries', {})
+        except (OSError, ValueError):
+            # Missing or unreadable manifest: everything is treated as changed
+            self.entries = {}
+
+    def _output_name(self, output_path: str) -> str:
+        return os.path.relpath(output_path, os.path.dirname(os.path.abspath(self.path))).replace(os.sep, '/')
+
+    def _entry_key(self, key: str, output_path: str) -> str:
+        return f"{key} -> {self._output_name(output_path)}"
+
+    def is_current(self, key: str, input_path: str, output_path: str) -> bool:
+        """Checks whether an input's existing output at output_path is still up to date.
+
+        Size and mtime are compared first so untouched files are never read;
+        the content hash is only computed when they differ.
+        """
+        entry = self.entries.get(self._entry_key(key, output_path))
+        if (not entry or entry.get('processor_version') != self.processor_version
+                or entry.get('maps_version') != self.maps_version
+                or entry.get('output') != self._output_name(output_path)
+                or not os.path.exists(output_path)):
+            return False
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return False
+        if entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+        if hash_file(input_path) != entry.get('content_hash'):
+            return False
+        # Touched but not changed: remember the new stat so the next run skips the hash
+        entry['size'], entry['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def record(self, key: str, input_path: str, output_path: str, content_hash: Optional[str] = None) -> None:
+        """Records a successful conversion of an input to output_path."""
+        stat = os.stat(input_path)
+        self.entries[self._entry_key(key, output_path)] = {
+            'output': self._output_name(output_path),
+            'content_hash': content_hash or hash_file(input_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'maps_version': self.maps_version,
+            'processor_version': self.processor_version,
+        }
+        self._dirty = True
+
+    def forget(self, key: str, output_path: str) -> None:
+        """Drops an input's entry for output_path, e.g. after a failed conversion."""
+        if self.entries.pop(self._entry_key(key, output_path), None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Writes the manifest if anything changed, replacing the old file atomically."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+        self._dirty = False
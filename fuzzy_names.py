@@ -0,0 +1,76 @@
+"""
+Fuzzy Name Matching
+===================
+
+Maps a mistyped speaker name ("Tolenaa", "Serfino") to the closest known
+alias without scanning every alias. Each alias is indexed by its character
+trigrams; a lookup counts the trigrams it shares with each alias through
+that inverted index, keeps the few best-overlapping candidates and only
+scores those with difflib's similarity ratio.
+"""
+
+import heapq
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set
+
+def trigrams(text: str) -> Set[str]:
+    """Returns the character trigrams of text, padded so word edges count."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Finds the best-matching alias for a name among a fixed alias -> full name map."""
+
+    # Candidates by trigram overlap that get the (slower) exact similarity score
+    CANDIDATES = 8
+
+    def __init__(self, names: Dict[str, str]):
+        self.aliases: List[str] = list(names)
+        self.full_names: List[str] = [names[alias] for alias in self.aliases]
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        for alias_id, alias in enumerate(self.aliases):
+            alias_trigrams = trigrams(alias)
+            self._sizes.append(len(alias_trigrams))
+            for trigram in alias_trigrams:
+                self._postings.setdefault(trigram, []).append(alias_id)
+
+    def match(self, name_lower: str, threshold: float) -> Optional[str]:
+        """Returns the full name of the closest alias scoring at least threshold.
+
+        Returns None when nothing is close enough, or when equally close
+        aliases belong to different characters.
+        """
+        name_trigrams = trigrams(name_lower)
+        shared: Dict[int, int] = {}
+        postings = self._postings
+        for trigram in name_trigrams:
+            for alias_id in postings.get(trigram, ()):
+                shared[alias_id] = shared.get(alias_id, 0) + 1
+        if not shared:
+            return None
+
+        # Rank by the Dice coefficient of the trigram sets
+        size = len(name_trigrams)
+        sizes = self._sizes
+        candidates = heapq.nlargest(self.CANDIDATES, shared,
+                                    key=lambda alias_id: shared[alias_id] / (size + sizes[alias_id]))
+
+        # seq2 is the side SequenceMatcher precomputes, so it holds the name
+        matcher = SequenceMatcher()
+        matcher.set_seq2(name_lower)
+        best_score = threshold
+        best_names: Set[str] = set()
+        for alias_id in candidates:
+            matcher.set_seq1(self.aliases[alias_id])
+            if matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score > best_score:
+                best_score = score
+                best_names = {self.full_names[alias_id]}
+            elif score == best_score:
+                best_names.add(self.full_names[alias_id])
+        if len(best_names) != 1:
+            return None
+        return best_names.pop()
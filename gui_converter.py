@@ -7,16 +7,55 @@ Provides a simple interface with drag-and-drop file support and URL input
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
+import queue
 import os
 import sys
-from log_converter import ContentProcessor, get_wikitext_from_url, process_file, WIKI_API_URL
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import log_converter
+from output_preview import OutputPreviewWindow
+from output_files import AtomicWriter
+from log_converter import (ContentProcessor, get_wikitext_from_url, process_file, write_processed_lines,
+                           _get_output_path, _safe_filename, _init_batch_worker, _convert_file_job,
+                           WIKI_API_URL, configure_logging)
 import logging
 
+# The worker thread never touches widgets; it posts events that the Tk main
+# loop drains every POLL_INTERVAL_MS, at most EVENT_BATCH_LIMIT at a time
+POLL_INTERVAL_MS = 50
+EVENT_BATCH_LIMIT = 500
+PROGRESS_STEP_LINES = 500
+
+# Batch queue: files are converted on a process pool, URLs are fetched and
+# converted on a small thread pool since they mostly wait on the network
+URL_WORKERS = 4
+BATCH_OUTPUT_DIR = "processed_logs"
+
+class ProcessingCancelled(Exception):
+    """Raised inside the worker when the user presses Cancel."""
+
+def _convert_url_item(page_url, output_dir):
+    """Fetch and convert one queued URL; returns the same tuple shape as _convert_file_job"""
+    result = get_wikitext_from_url(page_url)
+    if not result or not result[1]:
+        return page_url, False, "No content fetched", ""
+    title, wikitext = result
+    output_path = os.path.join(output_dir, f"{_safe_filename(title)}.txt")
+    with AtomicWriter(output_path) as f:
+        f.write(ContentProcessor().process_log_content(title, wikitext))
+    return page_url, True, output_path, ""
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
 class LogConverterGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Log Converter")
-        self.root.geometry("600x500")
+        self.root.geometry("700x760")
         self.root.resizable(True, True)
         
         # Configure logging to capture in GUI
@@ -24,6 +63,13 @@ class LogConverterGUI:
         
         # Variables  
         self.processing = False
+        self.worker = None
+        self.cancel_event = None
+        self.events = queue.Queue()
+        self.queue_items = {}
+        self.item_outputs = {}
+        self.last_output_path = None
+        self._next_item_id = 0
         
         print("LogConverterGUI: Initializing...")  # Console debug
         
@@ -32,6 +78,8 @@ class LogConverterGUI:
         
         print("LogConverterGUI: Widgets created")  # Console debug
         
+        self.root.after(POLL_INTERVAL_MS, self._drain_events)
+        
     def create_widgets(self):
         """Create the GUI widgets"""
         # Main frame
@@ -66,7 +114,7 @@ class LogConverterGUI:
         self.drop_frame.columnconfigure(0, weight=1)
         self.drop_frame.grid_propagate(False)  # Maintain fixed height
         
-        drop_label = tk.Label(self.drop_frame, text="Drag and drop files here or click to browse", 
+        drop_label = tk.Label(self.drop_frame, text="Drag and drop files here or click to browse (several files go to the batch queue)", 
                              bg="lightgray", fg="gray")
         drop_label.grid(row=0, column=0, pady=20)
         
@@ -105,20 +153,62 @@ class LogConverterGUI:
         self.output_entry = ttk.Entry(output_frame, textvariable=self.output_var, width=50)
         self.output_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 5))
         
-        # Process button
-        self.process_btn = ttk.Button(main_frame, text="Process Log", command=self.process_log)
-        self.process_btn.grid(row=4, column=0, columnspan=3, pady=10)
+        # Process and Cancel buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=4, column=0, columnspan=3, pady=10)
+        self.process_btn = ttk.Button(button_frame, text="Process Log", command=self.process_log)
+        self.process_btn.grid(row=0, column=0, padx=(0, 5))
+        self.cancel_btn = ttk.Button(button_frame, text="Cancel", command=self.cancel_processing, state='disabled')
+        self.cancel_btn.grid(row=0, column=1, padx=(0, 5))
+        self.preview_btn = ttk.Button(button_frame, text="Preview Output", command=self.preview_output, state='disabled')
+        self.preview_btn.grid(row=0, column=2)
         
         # Progress bar
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        progress_frame.columnconfigure(0, weight=1)
+        self.progress = ttk.Progressbar(progress_frame, mode='indeterminate')
+        self.progress.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.progress_var = tk.StringVar()
+        ttk.Label(progress_frame, textvariable=self.progress_var, width=24, anchor=tk.E).grid(row=0, column=1, padx=(5, 0))
+        
+        # Batch queue
+        queue_frame = ttk.LabelFrame(main_frame, text="Batch Queue", padding="10")
+        queue_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        queue_frame.columnconfigure(0, weight=1)
+        queue_frame.rowconfigure(0, weight=1)
+        main_frame.rowconfigure(6, weight=1)
+        
+        self.queue_tree = ttk.Treeview(queue_frame, columns=("source", "status"), show="headings", height=6)
+        self.queue_tree.heading("source", text="File / URL")
+        self.queue_tree.heading("status", text="Status")
+        self.queue_tree.column("source", width=440)
+        self.queue_tree.column("status", width=160)
+        self.queue_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        queue_scroll = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=self.queue_tree.yview)
+        queue_scroll.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.queue_tree.configure(yscrollcommand=queue_scroll.set)
+        self.queue_tree.bind('<Double-1>', self.preview_queue_item)
+        
+        queue_buttons = ttk.Frame(queue_frame)
+        queue_buttons.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+        queue_buttons.columnconfigure(5, weight=1)
+        ttk.Button(queue_buttons, text="Add Files", command=self.add_files_to_queue).grid(row=0, column=0, padx=(0, 5))
+        ttk.Button(queue_buttons, text="Add URL", command=self.add_url_to_queue).grid(row=0, column=1, padx=(0, 5))
+        ttk.Button(queue_buttons, text="Remove", command=self.remove_queue_selection).grid(row=0, column=2, padx=(0, 5))
+        ttk.Button(queue_buttons, text="Clear", command=self.clear_queue).grid(row=0, column=3, padx=(0, 5))
+        ttk.Label(queue_buttons, text="Output folder:").grid(row=0, column=4, padx=(10, 5))
+        self.batch_output_var = tk.StringVar(value=BATCH_OUTPUT_DIR)
+        ttk.Entry(queue_buttons, textvariable=self.batch_output_var, width=18).grid(row=0, column=5, sticky=(tk.W, tk.E))
+        self.process_queue_btn = ttk.Button(queue_buttons, text="Process Queue", command=self.process_queue)
+        self.process_queue_btn.grid(row=0, column=6, padx=(5, 0))
         
         # Status/Results area
         results_frame = ttk.LabelFrame(main_frame, text="Status", padding="10")
-        results_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        results_frame.grid(row=7, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         results_frame.columnconfigure(0, weight=1)
         results_frame.rowconfigure(0, weight=1)
-        main_frame.rowconfigure(6, weight=1)
+        main_frame.rowconfigure(7, weight=1)
         
         self.status_text = scrolledtext.ScrolledText(results_frame, height=8, wrap=tk.WORD)
         self.status_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -161,29 +251,95 @@ class LogConverterGUI:
     def on_file_drop(self, event):
         """Handle file drop events"""
         try:
-            files = event.data.split()
-            if files:
-                # Clean up the file path (remove brackets and quotes)
-                file_path = files[0].strip('{}')
+            # splitlist understands Tcl's {braced paths with spaces}
+            files = self.root.tk.splitlist(event.data)
+            if len(files) == 1:
+                file_path = files[0]
                 self.file_var.set(file_path)
                 self.log_status(f"File dropped: {os.path.basename(file_path)}")
+            elif files:
+                self.add_to_queue('file', files)
         except Exception as e:
             self.log_status(f"Error handling dropped file: {e}")
             # Fall back to browse dialog
             self.browse_file()
     
     def browse_file(self):
-        """Open file dialog to select a file"""
-        filename = filedialog.askopenfilename(
-            title="Select Log File",
+        """Open file dialog to select one or more files"""
+        filenames = filedialog.askopenfilenames(
+            title="Select Log File(s)",
             filetypes=[
                 ("Text files", "*.txt"),
                 ("All files", "*.*")
             ]
         )
-        if filename:
-            self.file_var.set(filename)
-            self.log_status(f"File selected: {os.path.basename(filename)}")
+        if len(filenames) == 1:
+            self.file_var.set(filenames[0])
+            self.log_status(f"File selected: {os.path.basename(filenames[0])}")
+        elif filenames:
+            self.add_to_queue('file', filenames)
+    
+    # --- Batch queue ---
+    def add_to_queue(self, kind, sources):
+        """Add files or URLs to the batch queue, skipping ones already queued"""
+        queued = set(self.queue_items.values())
+        added = 0
+        for source in sources:
+            if (kind, source) in queued:
+                continue
+            iid = str(self._next_item_id)
+            self._next_item_id += 1
+            self.queue_items[iid] = (kind, source)
+            queued.add((kind, source))
+            self.queue_tree.insert('', tk.END, iid=iid, values=(source, "Pending"))
+            added += 1
+        self.log_status(f"Added {added} item(s) to the batch queue ({len(self.queue_items)} queued)")
+    
+    def add_files_to_queue(self):
+        filenames = filedialog.askopenfilenames(
+            title="Add Log Files to Queue",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if filenames:
+            self.add_to_queue('file', filenames)
+    
+    def add_url_to_queue(self):
+        """Queue the URL from the URL field (several may be separated by whitespace)"""
+        urls = self.url_var.get().split()
+        if not urls:
+            messagebox.showerror("Error", "Enter a wiki page URL in the URL field first")
+            return
+        self.add_to_queue('url', urls)
+        self.url_var.set("")
+    
+    def remove_queue_selection(self):
+        if self.processing:
+            return
+        for iid in self.queue_tree.selection():
+            self.queue_tree.delete(iid)
+            self.queue_items.pop(iid, None)
+    
+    def clear_queue(self):
+        if self.processing:
+            return
+        self.queue_tree.delete(*self.queue_tree.get_children())
+        self.queue_items.clear()
+        self.item_outputs.clear()
+    
+    # --- Output preview ---
+    def preview_output(self, path=None):
+        """Open the converted output in the virtualized preview window"""
+        path = path or self.last_output_path
+        if not path or not os.path.exists(path):
+            messagebox.showerror("Error", "No converted output to preview yet")
+            return
+        OutputPreviewWindow(self.root, path)
+    
+    def preview_queue_item(self, event):
+        """Double-click on a converted queue item previews its output"""
+        iid = self.queue_tree.identify_row(event.y)
+        if iid in self.item_outputs:
+            self.preview_output(self.item_outputs[iid])
     
     def configure_api(self):
         """Configure the Wiki API URL"""
@@ -199,9 +355,9 @@ class LogConverterGUI:
             else:
                 return
         
-        # Update the global variable
+        # Update the global variable, and the one the fetch functions read
         global WIKI_API_URL
-        WIKI_API_URL = api_url
+        WIKI_API_URL = log_converter.WIKI_API_URL = api_url
         
         self.log_status(f"Wiki API URL configured: {api_url}")
         messagebox.showinfo("Success", f"Wiki API URL set to:\n{api_url}")
@@ -251,253 +407,324 @@ Note: You need both URLs configured to use this feature."""
         messagebox.showinfo("URL Input Help", help_text)
     
     def log_status(self, message):
-        """Add a message to the status area"""
-        self.status_text.insert(tk.END, f"{message}\n")
-        self.status_text.see(tk.END)
-        self.root.update_idletasks()
+        """Queue a message for the status area (safe to call from any thread)"""
+        self.events.put(('status', message))
     
     def clear_status(self):
         """Clear the status area"""
         self.status_text.delete(1.0, tk.END)
     
-    def process_log(self):
-        """Process the log file or URL"""
+    def _drain_events(self):
+        """Apply queued worker events to the widgets in one batch"""
+        messages = []
+        progress = None
+        batch_progress = None
+        item_states = {}
+        finished = None
         try:
-            self.log_status("=== PROCESS BUTTON CLICKED ===")
-            self.root.update()  # Force GUI update
-            
-            if self.processing:
-                self.log_status("Already processing, ignoring...")
-                return
-                
-            # Validate inputs
-            file_path = self.file_var.get().strip()
-            url = self.url_var.get().strip()
-            output_file = self.output_var.get().strip()
-            
-            self.log_status(f"File path: '{file_path}'")
-            self.log_status(f"URL: '{url}'")
-            self.log_status(f"Output file: '{output_file}'")
-            self.root.update()  # Force GUI update
-            
-            if not file_path and not url:
-                self.log_status("ERROR: No file or URL provided")
-                messagebox.showerror("Error", "Please select a file or enter a URL")
-                return
-                
-            if file_path and url:
-                self.log_status("ERROR: Both file and URL provided")
-                messagebox.showerror("Error", "Please select either a file OR enter a URL, not both")
-                return
-                
-            if not output_file:
-                self.log_status("ERROR: No output filename")
-                messagebox.showerror("Error", "Please specify an output filename")
-                return
-            
-            # Update global API URL if configured in GUI
-            if url:
-                global WIKI_API_URL
-                gui_api_url = self.api_url_var.get().strip()
-                if gui_api_url and gui_api_url != WIKI_API_URL:
-                    WIKI_API_URL = gui_api_url
-                    self.log_status(f"Using API URL: {WIKI_API_URL}")
-                
-                # Check URL configuration
-                if 'wiki.yourdomain.com' in WIKI_API_URL:
-                    self.log_status("ERROR: Wiki API URL not configured")
-                    messagebox.showerror("Configuration Error", 
-                                       "Please configure the Wiki API URL using the 'Set API' button before using URL input")
-                    return
+            for _ in range(EVENT_BATCH_LIMIT):
+                event = self.events.get_nowait()
+                kind = event[0]
+                if kind == 'status':
+                    messages.append(event[1])
+                elif kind == 'progress':
+                    # Only the latest position matters
+                    progress = event[1:]
+                elif kind == 'batch':
+                    batch_progress = event[1:]
+                elif kind == 'item':
+                    item_states[event[1]] = event[2:]
+                else:
+                    finished = event
+                    break
+        except queue.Empty:
+            pass
+        
+        if messages:
+            self.status_text.insert(tk.END, "\n".join(messages) + "\n")
+            self.status_text.see(tk.END)
+        if progress:
+            self._show_progress(*progress)
+        for iid, state in item_states.items():
+            if len(state) > 1:
+                self.item_outputs[iid] = state[1]
+            if self.queue_tree.exists(iid):
+                self.queue_tree.set(iid, "status", state[0])
+        if batch_progress:
+            self._show_batch_progress(*batch_progress)
+        if finished:
+            self._processing_complete(*finished)
+        
+        delay = 1 if not self.events.empty() else POLL_INTERVAL_MS
+        self.root.after(delay, self._drain_events)
+    
+    def _show_progress(self, done, total):
+        """Switch the progress bar to determinate mode once a line count is known"""
+        if total <= 0:
+            return
+        if str(self.progress.cget('mode')) != 'determinate':
+            self.progress.stop()
+            self.progress.config(mode='determinate', maximum=total)
+        self.progress.config(value=done)
+        self.progress_var.set(f"{done:,} / {total:,} lines")
+    
+    def _show_batch_progress(self, done, total, elapsed):
+        """Show queue progress with throughput and an ETA"""
+        self.progress.stop()
+        self.progress.config(mode='determinate', maximum=max(total, 1), value=done)
+        rate = done / elapsed if elapsed > 0 else 0.0
+        if rate and done < total:
+            eta = f", ETA {_format_duration((total - done) / rate)}"
+        else:
+            eta = ""
+        self.progress_var.set(f"{done}/{total} logs, {rate * 60:.1f}/min{eta}")
+    
+    def process_log(self):
+        """Validate the inputs and start processing on a worker thread"""
+        if self.processing:
+            self.log_status("Already processing, ignoring...")
+            return
             
-            # Process directly in main thread for now (no threading to avoid issues)
-            self.log_status("=== STARTING PROCESSING ===")
-            self.processing = True
-            self.process_btn.config(state='disabled')
-            self.progress.start()
-            self.root.update()  # Force GUI update
+        # Validate inputs
+        file_path = self.file_var.get().strip()
+        url = self.url_var.get().strip()
+        output_file = self.output_var.get().strip()
+        
+        if not file_path and not url:
+            self.log_status("ERROR: No file or URL provided")
+            messagebox.showerror("Error", "Please select a file or enter a URL")
+            return
             
-            # Process directly
-            self._process_directly(file_path, url, output_file)
+        if file_path and url:
+            self.log_status("ERROR: Both file and URL provided")
+            messagebox.showerror("Error", "Please select either a file OR enter a URL, not both")
+            return
             
-        except Exception as e:
-            self.log_status(f"CRITICAL ERROR in process_log: {e}")
-            import traceback
-            self.log_status(f"Full traceback: {traceback.format_exc()}")
-            messagebox.showerror("Error", f"An error occurred: {e}")
-            self._processing_complete()
+        if not output_file:
+            self.log_status("ERROR: No output filename")
+            messagebox.showerror("Error", "Please specify an output filename")
+            return
+        
+        if url and not self._apply_api_url():
+            return
+        
+        self.log_status("=== STARTING PROCESSING ===")
+        self._start_worker(self._process_worker, file_path, url, output_file)
+    
+    def _apply_api_url(self):
+        """Use the API URL configured in the GUI for wiki fetches; False if it is still the placeholder"""
+        global WIKI_API_URL
+        gui_api_url = self.api_url_var.get().strip()
+        if gui_api_url and gui_api_url != log_converter.WIKI_API_URL:
+            WIKI_API_URL = log_converter.WIKI_API_URL = gui_api_url
+            self.log_status(f"Using API URL: {WIKI_API_URL}")
+        
+        # Check URL configuration
+        if 'wiki.yourdomain.com' in log_converter.WIKI_API_URL:
+            self.log_status("ERROR: Wiki API URL not configured")
+            messagebox.showerror("Configuration Error", 
+                               "Please configure the Wiki API URL using the 'Set API' button before using URL input")
+            return False
+        return True
+    
+    def _start_worker(self, target, *args):
+        """Lock the controls and run target(*args, cancel_event) on a worker thread"""
+        self.processing = True
+        self.cancel_event = threading.Event()
+        self.process_btn.config(state='disabled')
+        self.process_queue_btn.config(state='disabled')
+        self.cancel_btn.config(state='normal')
+        self.progress.config(mode='indeterminate', value=0)
+        self.progress.start()
+        self.progress_var.set("")
+        
+        self.worker = threading.Thread(target=target, args=args + (self.cancel_event,), daemon=True)
+        self.worker.start()
+    
+    def process_queue(self):
+        """Convert every pending queue item on the worker pools"""
+        if self.processing:
+            return
+        pending = [(iid, *self.queue_items[iid]) for iid in self.queue_tree.get_children()
+                   if self.queue_tree.set(iid, "status") != "Done"]
+        if not pending:
+            messagebox.showinfo("Batch Queue", "Nothing to process: add files or URLs to the queue first")
+            return
+        if any(kind == 'url' for _, kind, _ in pending) and not self._apply_api_url():
+            return
+        output_dir = _get_output_path(self.batch_output_var.get().strip() or BATCH_OUTPUT_DIR)
+        for iid, _, _ in pending:
+            self.queue_tree.set(iid, "status", "Queued")
+        self.log_status(f"=== PROCESSING {len(pending)} QUEUED ITEM(S) ===")
+        self._start_worker(self._batch_worker, pending, output_dir)
     
-    def _process_directly(self, file_path, url, output_file):
-        """Process directly in main thread for debugging"""
+    def _batch_worker(self, items, output_dir, cancel_event):
+        """Worker thread: fan queue items out to the pools and report each result"""
+        os.makedirs(output_dir, exist_ok=True)
+        start = time.perf_counter()
+        file_items = [item for item in items if item[1] == 'file']
+        url_items = [item for item in items if item[1] == 'url']
+        file_pool = url_pool = None
+        futures = {}
+        succeeded, failed = 0, []
         try:
-            self.log_status("Processing started...")
-            self.root.update()
-            
-            title = ""
-            wikitext = ""
-            
-            if file_path:
-                self.log_status(f"Reading file: {file_path}")
-                self.root.update()
-                
-                # Check if file exists first
-                if not os.path.exists(file_path):
-                    self.log_status(f"File does not exist: {file_path}")
-                    return
-                    
-                result = process_file(file_path)
-                if result:
-                    title, wikitext = result
-                    self.log_status("File read successfully")
-                    self.log_status(f"Title: {title}")
-                    self.log_status(f"Content length: {len(wikitext)} characters")
-                    self.root.update()
-                else:
-                    self.log_status("Failed to read file")
-                    return
-                    
-            elif url:
-                self.log_status(f"Fetching from URL: {url}")
-                self.root.update()
-                result = get_wikitext_from_url(url)
-                if result:
-                    title, wikitext = result
-                    self.log_status("URL content fetched successfully")
-                    self.root.update()
-                else:
-                    self.log_status("Failed to fetch URL content")
-                    return
-            
-            if not wikitext:
-                self.log_status("No content to process")
-                return
+            if file_items:
+                workers = max(1, min(os.cpu_count() or 1, len(file_items)))
+                file_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker)
+                used_names = set()
+                for iid, _, source in file_items:
+                    # Different folders may hold files with the same name
+                    stem, ext = os.path.splitext(os.path.basename(source))
+                    name, counter = f"{stem}{ext or '.txt'}", 1
+                    while name.lower() in used_names:
+                        counter += 1
+                        name = f"{stem}_{counter}{ext or '.txt'}"
+                    used_names.add(name.lower())
+                    job = (source, os.path.join(output_dir, name))
+                    futures[file_pool.submit(_convert_file_job, job)] = iid
+            if url_items:
+                url_pool = ThreadPoolExecutor(max_workers=min(URL_WORKERS, len(url_items)))
+                for iid, _, source in url_items:
+                    futures[url_pool.submit(_convert_url_item, source, output_dir)] = iid
             
-            self.log_status("Processing content...")
-            self.root.update()
-            
-            processor = ContentProcessor()
-            processed_content = processor.process_log_content(title, wikitext)
-            
-            self.log_status("Content processed successfully!")
-            self.log_status(f"Processed content length: {len(processed_content)} characters")
-            self.root.update()
-            
-            # Save output
-            try:
-                script_dir = os.path.dirname(os.path.realpath(__file__))
-                output_path = os.path.join(script_dir, output_file)
-                
-                self.log_status(f"Saving to: {output_path}")
-                self.root.update()
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(processed_content)
-                
-                self.log_status(f"=== SUCCESS! ===")
-                self.log_status(f"File saved to: {output_path}")
-                self.log_status(f"Processed {len(wikitext.splitlines())} lines")
-                
-                # Show success message
-                messagebox.showinfo("Success", f"Processing complete!\n\nFile saved to:\n{output_path}")
-                
-                # Offer to open the file
-                if messagebox.askyesno("Open File", "Would you like to open the processed file?"):
+            pending = set(futures)
+            while pending:
+                if cancel_event.is_set():
+                    for future in pending:
+                        if future.cancel():
+                            self.events.put(('item', futures[future], "Cancelled"))
+                    pending = {future for future in pending if not future.cancelled()}
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    iid = futures[future]
+                    source = self.queue_items.get(iid, ('', iid))[1]
                     try:
-                        if sys.platform.startswith('win'):
-                            os.startfile(output_path)
-                        elif sys.platform.startswith('darwin'):
-                            os.system(f'open "{output_path}"')
-                        else:
-                            os.system(f'xdg-open "{output_path}"')
+                        _, ok, detail, _ = future.result()
                     except Exception as e:
-                        messagebox.showerror("Error", f"Could not open file: {e}")
-                
-            except Exception as e:
-                self.log_status(f"Error writing output file: {e}")
-                messagebox.showerror("Error", f"Could not save file: {e}")
-                
+                        ok, detail = False, str(e)
+                    if ok:
+                        succeeded += 1
+                        self.events.put(('item', iid, "Done", detail))
+                    else:
+                        failed.append(f"{os.path.basename(source) or source}: {detail}")
+                        self.events.put(('item', iid, "Failed"))
+                        self.log_status(f"[FAILED] {source}: {detail}")
+                    self.events.put(('batch', succeeded + len(failed), len(items), time.perf_counter() - start))
         except Exception as e:
-            self.log_status(f"Processing error: {e}")
-            import traceback
-            self.log_status(f"Full traceback: {traceback.format_exc()}")
-            messagebox.showerror("Error", f"Processing failed: {e}")
+            failed.append(f"Batch error: {e}")
         finally:
-            # Re-enable UI
-            self._processing_complete()
+            # Nothing left to wait for after an error; drop what has not started
+            for future in futures:
+                future.cancel()
+            for pool in (file_pool, url_pool):
+                if pool is not None:
+                    pool.shutdown(wait=True)
+        
+        elapsed = time.perf_counter() - start
+        skipped = len(items) - succeeded - len(failed)
+        summary = [f"Converted {succeeded} of {len(items)} item(s) in {_format_duration(elapsed)}.",
+                   f"Output folder: {output_dir}"]
+        if skipped > 0:
+            summary.append(f"Cancelled: {skipped}")
+        if failed:
+            summary.append(f"Failed: {len(failed)}")
+            summary.extend(f"  {message}" for message in failed[:10])
+            if len(failed) > 10:
+                summary.append(f"  ... and {len(failed) - 10} more (see status log)")
+        self.log_status("\n".join(summary))
+        self.events.put(('done', 'batch', "\n".join(summary)))
+    
+    def cancel_processing(self):
+        """Ask the worker to stop at the next progress checkpoint"""
+        if self.processing and self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_btn.config(state='disabled')
+            self.log_status("Cancelling...")
     
-    def _process_worker(self, file_path, url, output_file):
-        """Worker thread for processing"""
+    def _iter_with_progress(self, lines, total, cancel_event):
+        """Yield input lines, reporting progress and honouring Cancel every few lines"""
+        step = max(1, min(PROGRESS_STEP_LINES, total // 200))
+        done = 0
+        for line in lines:
+            done += 1
+            if done % step == 0:
+                if cancel_event.is_set():
+                    raise ProcessingCancelled()
+                self.events.put(('progress', done, total))
+            yield line
+        self.events.put(('progress', total, total))
+    
+    def _process_worker(self, file_path, url, output_file, cancel_event):
+        """Worker thread: read or fetch, convert and save, reporting through the event queue"""
         try:
-            self.log_status("Worker thread started!")
-            self.log_status("Starting processing...")
-            
-            title = ""
-            wikitext = ""
-            
             if file_path:
                 self.log_status(f"Reading file: {file_path}")
-                # Check if file exists first
                 if not os.path.exists(file_path):
-                    self.log_status(f"File does not exist: {file_path}")
+                    self.events.put(('done', 'error', f"File does not exist: {file_path}"))
                     return
-                    
                 result = process_file(file_path)
-                if result:
-                    title, wikitext = result
-                    self.log_status("File read successfully")
-                    self.log_status(f"Title: {title}")
-                    self.log_status(f"Content length: {len(wikitext)} characters")
-                else:
-                    self.log_status("Failed to read file")
-                    return
-                    
-            elif url:
+            else:
                 self.log_status(f"Fetching from URL: {url}")
                 result = get_wikitext_from_url(url)
-                if result:
-                    title, wikitext = result
-                    self.log_status("URL content fetched successfully")
-                else:
-                    self.log_status("Failed to fetch URL content")
-                    return
             
-            if not wikitext:
-                self.log_status("No content to process")
+            if not result or not result[1]:
+                self.events.put(('done', 'error', "No content to process"))
                 return
+            if cancel_event.is_set():
+                raise ProcessingCancelled()
+            
+            title, wikitext = result
+            lines = wikitext.splitlines()
+            self.log_status(f"Title: {title}")
+            self.log_status(f"Processing {len(lines):,} lines...")
             
-            self.log_status("Processing content...")
+            # write_processed_lines replaces the output atomically, so a
+            # cancelled run leaves any previous output untouched
+            output_path = _get_output_path(output_file)
             processor = ContentProcessor()
-            processed_content = processor.process_log_content(title, wikitext)
+            processed_lines = processor.iter_processed_lines(
+                title, self._iter_with_progress(lines, len(lines), cancel_event)
+            )
+            written = write_processed_lines(output_path, title, processed_lines)
             
-            # Save output
-            try:
-                script_dir = os.path.dirname(os.path.realpath(__file__))
-                output_path = os.path.join(script_dir, output_file)
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(processed_content)
-                
-                self.log_status(f"Successfully processed and saved to: {output_path}")
-                self.log_status(f"Processed {len(wikitext.splitlines())} lines")
-                
-                # Offer to open the file
-                self.root.after(0, lambda: self._ask_open_file(output_path))
-                
-            except Exception as e:
-                self.log_status(f"Error writing output file: {e}")
-                
+            self.log_status(f"=== SUCCESS! ===")
+            self.log_status(f"Processed {len(lines):,} lines into {written:,} output lines")
+            self.events.put(('done', 'success', output_path))
+            
+        except ProcessingCancelled:
+            self.events.put(('done', 'cancelled', "Processing cancelled; no output written"))
         except Exception as e:
-            self.log_status(f"Processing error: {e}")
             import traceback
             self.log_status(f"Full traceback: {traceback.format_exc()}")
-        finally:
-            # Re-enable UI
-            self.root.after(0, self._processing_complete)
+            self.events.put(('done', 'error', f"Processing failed: {e}"))
     
-    def _processing_complete(self):
-        """Called when processing is complete"""
+    def _processing_complete(self, kind='done', outcome='success', detail=''):
+        """Called on the main thread when the worker has finished"""
         self.processing = False
+        self.worker = None
         self.process_btn.config(state='normal')
+        self.process_queue_btn.config(state='normal')
+        self.cancel_btn.config(state='disabled')
         self.progress.stop()
+        
+        if outcome == 'batch':
+            # One summary for the whole queue instead of a dialog per file
+            messagebox.showinfo("Batch Complete", detail + "\n\nDouble-click a converted item to preview it.")
+        elif outcome == 'success':
+            self.last_output_path = detail
+            self.preview_btn.config(state='normal')
+            self.status_text.insert(tk.END, f"File saved to: {detail}\n")
+            self.status_text.see(tk.END)
+            self._ask_open_file(detail)
+        elif outcome == 'cancelled':
+            self.progress.config(value=0)
+            self.progress_var.set("Cancelled")
+            self.status_text.insert(tk.END, f"{detail}\n")
+            self.status_text.see(tk.END)
+        else:
+            self.status_text.insert(tk.END, f"{detail}\n")
+            self.status_text.see(tk.END)
+            messagebox.showerror("Error", detail)
     
     def _ask_open_file(self, file_path):
         """Ask if user wants to open the output file"""
@@ -515,6 +742,7 @@ Note: You need both URLs configured to use this feature."""
 
 def main():
     """Main GUI application entry point"""
+    configure_logging()
     # Try to use tkinterdnd2 for drag and drop support
     try:
         import tkinterdnd2
@@ -533,4 +761,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Needed for the batch queue's process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Structured Line Records
+=======================
+
+The processor's intermediate representation: one compact LogLine per output
+line holding the line number, scene code, interned speaker id, action flag
+and cleaned text. The classic "-Line N- -Scene A- Speaker: text" format is
+just one serializer (render_lines) on top of these records, so other
+consumers can read typed fields instead of re-parsing that text.
+"""
+
+from typing import Dict, Iterable, Iterator, List
+
+# Scene codes: no scene tag, a [DOIC] setting line, or the scene letter
+SCENE_NONE = ""
+SCENE_SETTING = "Setting"
+
+# Lexer scene tags -> scene codes, and back for rendering
+SCENE_CODES: Dict[str, str] = {"": SCENE_NONE, "-Setting-": SCENE_SETTING}
+_SCENE_TAGS: Dict[str, str] = {SCENE_NONE: "", SCENE_SETTING: "-Setting-"}
+for _letter in "ABCDEF?":
+    SCENE_CODES[f"-Scene {_letter}-"] = _letter
+    _SCENE_TAGS[_letter] = f"-Scene {_letter}-"
+
+class SpeakerTable:
+    """Interns speaker names of one log; id 0 is always "no speaker"."""
+
+    __slots__ = ('names', 'ids')
+
+    def __init__(self):
+        self.names: List[str] = [""]
+        self.ids: Dict[str, int] = {"": 0}
+
+    def intern(self, name: str) -> int:
+        speaker_id = self.ids.get(name)
+        if speaker_id is None:
+            speaker_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return speaker_id
+
+    def __getitem__(self, speaker_id: int) -> str:
+        return self.names[speaker_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+class LogLine:
+    """One converted line; the speaker is an id into the log's SpeakerTable."""
+
+    __slots__ = ('line_number', 'scene', 'speaker_id', 'is_action', 'text')
+
+    def __init__(self, line_number: int, scene: str, speaker_id: int, is_action: bool, text: str):
+        self.line_number = line_number
+        self.scene = scene
+        self.speaker_id = speaker_id
+        self.is_action = is_action
+        self.text = text
+
+    def __repr__(self) -> str:
+        return (f"LogLine({self.line_number}, {self.scene!r}, {self.speaker_id}, "
+                f"{self.is_action}, {self.text!r})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LogLine):
+            return NotImplemented
+        return (self.line_number, self.scene, self.speaker_id, self.is_action, self.text) == \
+               (other.line_number, other.scene, other.speaker_id, other.is_action, other.text)
+
+def render_lines(records: Iterable[LogLine], speakers: SpeakerTable) -> Iterator[str]:
+    """Serializes records lazily, one text line per record."""
+    tags = _SCENE_TAGS
+    names = speakers.names
+    for record in records:
+        rendered = f"-Line {record.line_number}- "
+        if record.scene:
+            rendered += f"{tags[record.scene]} "
+        if record.speaker_id:
+            rendered += f"{names[record.speaker_id]}: "
+        yield rendered + record.text
@@ -1,93 +1,191 @@
 import re
 import argparse
-import requests
-from typing import Tuple, Optional
+import json
+from typing import Tuple, Optional, Iterable, Iterator, List, Dict, AsyncIterator, TYPE_CHECKING
 import logging
 import os
+import sys
+import glob
+import mmap
+import threading
+import time
 
-# This file is copied from the Elsie project and should be kept in sync
+# Network, async and pool modules are imported where they are used, so a plain
+# --file conversion starts without paying for requests, asyncio or sqlite3.
+if TYPE_CHECKING:
+    import asyncio
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+    from pipeline import StageStats
+    from wiki_cache import RevisionCache
+
+# Character resolution lives in character_maps.py, which reads its maps from
+# character_maps.json through character_store.py; all three ship together
 try:
-    from character_maps import SHIP_SPECIFIC_CHARACTER_CORRECTIONS, resolve_character_name_with_context, FALLBACK_CHARACTER_CORRECTIONS, FLEET_SHIP_NAMES
+    from character_maps import SHIP_SPECIFIC_CHARACTER_CORRECTIONS, resolve_character_name_with_context, FALLBACK_CHARACTER_CORRECTIONS, FLEET_SHIP_NAMES, find_ship_context, reload_character_maps, set_fuzzy_matching, DEFAULT_FUZZY_THRESHOLD, character_maps_version
 except ImportError:
-    print("ERROR: character_maps.py not found. Please ensure it is in the same directory.")
+    print("ERROR: character_maps.py or character_store.py not found. Please ensure they are in the same directory.")
+    exit(1)
+except (OSError, ValueError) as e:
+    print(f"ERROR: could not load character_maps.json ({e}). Please ensure it is in the same directory "
+          f"or set LOGCONVERT_CHARACTER_MAPS.")
     exit(1)
+from conversion_manifest import ConversionManifest, MANIFEST_NAME, hash_file
+from profiler import StageProfiler, profile_stage
+from line_records import LogLine, SpeakerTable, render_lines, SCENE_CODES
+from output_files import AtomicWriter
+from log_export import OUTPUT_FORMATS, FORMAT_EXTENSIONS, SqliteExporter, record_rows, write_jsonl, write_jsonl_rows
 
 
 # --- Standalone Configuration ---
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging is configured by the entry points (configure_logging), not on import
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Sets up console logging for the command-line and GUI entry points."""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+_fuzzy_threshold: Optional[float] = None
+
+def configure_fuzzy_names(threshold: Optional[float]) -> None:
+    """Turns fuzzy matching of unknown speaker names on (with a threshold) or off in this process."""
+    global _fuzzy_threshold
+    _fuzzy_threshold = threshold
+    set_fuzzy_matching(threshold)
 
 # MediaWiki API endpoint for the wiki you are targeting.
 # Default is set to 22nd Mobile Fandom wiki, but can be changed for other wikis.
 # For example: 'https://stardancer.org/api.php'
 WIKI_API_URL = 'https://22ndmobile.fandom.com/api.php'
 
+# Bump whenever a change to ContentProcessor alters its output, so incremental
+# batch runs know to reconvert everything (see conversion_manifest.py).
+PROCESSOR_VERSION = "2"
+
+# --- Precompiled line lexer ---
+# Every pattern the per-line chain needs is compiled once at import time.
+# _HEAD_RE consumes the leading timestamp and a scene tag sitting right after
+# it in one match; _SPEAKER_RE tries the bracket, @-tag and colon speaker
+# forms in priority order as a single alternation.
+_TIMESTAMP_RE = re.compile(r'^\s*\[\s*\d{1,2}:\d{2}(?::\d{2})?\s*\]\s*')
+_DOIC_RE = re.compile(r'\[\s*(DOIC(\d)?)\s*\]', re.IGNORECASE)
+_HEAD_RE = re.compile(
+    r'\s*(?P<timestamp>\[\s*\d{1,2}:\d{2}(?::\d{2})?\s*\])?\s*'
+    r'(?:\[\s*(?P<tag>DOIC(?P<digit>\d)?)\s*\]\s*)?',
+    re.IGNORECASE
+)
+_SPEAKER_RE = re.compile(
+    r'\s*(?:\[\s*(?P<bracket>[^\]]+?)\s*\]'
+    r'|(?P<at>[^:]+@\S+)\s*:'
+    r'|(?P<colon>[^:]{2,40}?)\s*:)'
+)
+_SPEAKER_NO_BRACKET_RE = re.compile(
+    r'\s*(?:(?P<at>[^:]+@\S+)\s*:'
+    r'|(?P<colon>[^:]{2,40}?)\s*:)'
+)
+_BOLD_RE = re.compile(r"'''(.*?)'''")
+_ITALIC_RE = re.compile(r"''(.*?)''")
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+SCENE_MAP = {'1': 'A', '2': 'B', '3': 'C', '4': 'D', '5': 'E', '6': 'F'}
+
 class ContentProcessor:
     """Handles content processing, classification, and formatting"""
     
-    def __init__(self):
+    def __init__(self, profiler: Optional[StageProfiler] = None):
         self.character_maps = SHIP_SPECIFIC_CHARACTER_CORRECTIONS
+        # Optional per-stage instrumentation; None keeps the hot path untouched
+        self.profiler = profiler
 
     def _cleanup_line(self, line: str) -> str:
         """Performs final formatting on the line content."""
-        line = re.sub(r"'''(.*?)'''", r'\\1', line)
-        line = re.sub(r"''(.*?)''", r'\\1', line)
+        # The substring checks skip the regex scans for the common plain line
+        if "''" in line:
+            line = _BOLD_RE.sub(r'\\1', line)
+            line = _ITALIC_RE.sub(r'\\1', line)
         # Remove any remaining HTML-like tags
-        line = re.sub(r'<[^>]+>', '', line)
+        if '<' in line:
+            line = _HTML_TAG_RE.sub('', line)
         return line
 
     def _remove_timestamp(self, line: str) -> str:
         """Removes a timestamp from the start of a line."""
-        timestamp_pattern = r'^\s*\[\s*\d{1,2}:\d{2}(?::\d{2})?\s*\]\s*'
-        return re.sub(timestamp_pattern, '', line)
+        return _TIMESTAMP_RE.sub('', line)
 
     def _convert_scene_tags(self, line: str) -> Tuple[str, str]:
         """Converts [DOIC] tags."""
         scene_tag = ""
-        scene_map = {'1': 'A', '2': 'B', '3': 'C', '4': 'D', '5': 'E', '6': 'F'}
-        doic_pattern = r'\[\s*(DOIC(\d)?)\s*\]'
-        match = re.search(doic_pattern, line, re.IGNORECASE)
+        match = _DOIC_RE.search(line)
         
         if match:
-            original_tag = match.group(0)
             digit = match.group(2)
-            scene_tag = f"-Scene {scene_map.get(digit, '?')}-" if digit else "-Setting-"
-            line = line.replace(original_tag, "", 1).lstrip()
+            scene_tag = f"-Scene {SCENE_MAP.get(digit, '?')}-" if digit else "-Setting-"
+            line = (line[:match.start()] + line[match.end():]).lstrip()
             
         return line, scene_tag
 
     def _assign_speaker(self, line: str, ship_context: str) -> Tuple[str, str]:
         """Assigns a speaker from patterns."""
-        # Pattern for speakers in brackets, e.g., [T'Pol]
-        bracket_speaker_pattern = r'^\s*\[\s*([^\]]+?)\s*\]'
-        bracket_match = re.search(bracket_speaker_pattern, line)
-        if bracket_match and self._is_known_character(bracket_match.group(1), ship_context):
-            speaker = bracket_match.group(1).strip()
-            # Remove the speaker tag and any following colon
-            line = line[bracket_match.end(0):].lstrip()
-            if line.startswith(':'):
-                line = line[1:].lstrip()
-            return line, speaker
-
-        # Pattern for speakers with @-tags, e.g., Archer@Captain:
-        at_tag_pattern = r'^\s*([^:]+@\S+)\s*:'
-        at_match = re.search(at_tag_pattern, line)
-        if at_match:
-            speaker = at_match.group(1).strip()
-            line = line[at_match.end(0):].lstrip()
-            return line, speaker
-        
-        # General pattern for 'Speaker: Dialogue'
-        colon_pattern = r'^\s*([^:]{2,40}?)\s*:'
-        colon_match = re.search(colon_pattern, line)
-        if colon_match:
-            potential_speaker = colon_match.group(1).strip()
-            # Heuristic to avoid matching parts of sentences
-            if (' ' in potential_speaker or (potential_speaker.isalpha() and potential_speaker[0].isupper())) and len(potential_speaker.split()) < 5:
-                 line = line[colon_match.end(0):].lstrip()
-                 return line, potential_speaker
-
-        return line, ""
+        return self._assign_speaker_at(line, 0, ship_context)
+
+    def _assign_speaker_at(self, line: str, pos: int, ship_context: str) -> Tuple[str, str]:
+        """Assigns a speaker from patterns, matching from ``pos`` onwards."""
+        match = _SPEAKER_RE.match(line, pos)
+        if match is None:
+            return line[pos:], ""
+
+        # Speakers in brackets, e.g., [T'Pol]
+        bracket = match.group('bracket')
+        if bracket is not None:
+            if self._is_known_character(bracket, ship_context):
+                speaker = bracket.strip()
+                # Remove the speaker tag and any following colon
+                line = line[match.end():].lstrip()
+                if line.startswith(':'):
+                    line = line[1:].lstrip()
+                return line, speaker
+            match = _SPEAKER_NO_BRACKET_RE.match(line, pos)
+            if match is None:
+                return line[pos:], ""
+
+        # Speakers with @-tags, e.g., Archer@Captain:
+        at_speaker = match.group('at')
+        if at_speaker is not None:
+            return line[match.end():].lstrip(), at_speaker.strip()
+
+        # General 'Speaker: Dialogue'
+        potential_speaker = match.group('colon').strip()
+        # Heuristic to avoid matching parts of sentences
+        if (' ' in potential_speaker or (potential_speaker.isalpha() and potential_speaker[0].isupper())) and len(potential_speaker.split()) < 5:
+            return line[match.end():].lstrip(), potential_speaker
+
+        return line[pos:], ""
+
+    def _lex_line(self, line: str, ship_context: str) -> Tuple[str, str, bool, str, str]:
+        """Splits a stripped line into its parts in a single pass.
+
+        Returns (timestamp, scene_tag, is_action_line, speaker, body),
+        matching what the _remove_timestamp -> _convert_scene_tags ->
+        _assign_speaker chain produces.
+        """
+        head = _HEAD_RE.match(line)
+        pos = head.end()
+        timestamp = head.group('timestamp') or ""
+        if head.group('tag') is not None:
+            digit = head.group('digit')
+            scene_tag = f"-Scene {SCENE_MAP.get(digit, '?')}-" if digit else "-Setting-"
+        else:
+            # A scene tag further into the line is cut out in place
+            scene_tag = ""
+            match = _DOIC_RE.search(line, pos)
+            if match:
+                digit = match.group(2)
+                scene_tag = f"-Scene {SCENE_MAP.get(digit, '?')}-" if digit else "-Setting-"
+                line = (line[pos:match.start()] + line[match.end():]).lstrip()
+                pos = 0
+
+        is_action_line = line.startswith('*', pos)
+        body, speaker = self._assign_speaker_at(line, pos, ship_context)
+        return timestamp, scene_tag, is_action_line, speaker, body
 
     def _is_known_character(self, name: str, ship_context: str) -> bool:
         """Checks if a name is a known character by trying to resolve it."""
@@ -96,36 +194,70 @@ class ContentProcessor:
 
     def _get_ship_context(self, title: str) -> str:
         """Determines the ship context from the page title."""
-        title_lower = title.lower()
-        for ship_name in FLEET_SHIP_NAMES:
-            if ship_name.lower() in title_lower:
-                return ship_name.lower().replace('uss ', '')
-        return ""
+        return find_ship_context(title)
 
     def process_log_content(self, title: str, wikitext: str) -> str:
         """Processes raw wikitext from a log page."""
         if not wikitext:
             return ""
         
+        cleaned_lines = self.iter_processed_lines(title, wikitext.splitlines())
+        return f"**{title}**\n\n" + "\n".join(cleaned_lines)
+
+    def iter_processed_lines(self, title: str, line_iterable: Iterable[str], line_number: int = 1,
+                             last_setting_speaker: str = "", last_processed_speaker: str = "",
+                             state: Optional[List[str]] = None) -> Iterator[str]:
+        """Yields processed output lines one at a time.
+
+        Carries the same speaker and scene state as process_log_content, so
+        joining the yielded lines with newlines under the "**title**" header
+        gives identical output without holding the whole log in memory.
+        The arguments are those of iter_line_records.
+        """
+        speakers = SpeakerTable()
+        return render_lines(
+            self.iter_line_records(title, line_iterable, speakers, line_number,
+                                   last_setting_speaker, last_processed_speaker, state),
+            speakers
+        )
+
+    def iter_line_records(self, title: str, line_iterable: Iterable[str], speakers: SpeakerTable,
+                          line_number: int = 1, last_setting_speaker: str = "",
+                          last_processed_speaker: str = "", state: Optional[List[str]] = None) -> Iterator[LogLine]:
+        """Yields a structured LogLine per output line, interning speakers into speakers.
+
+        The line number and speaker state can be seeded to continue a log
+        part-way through. If a state list is given, it is set to
+        [last_setting_speaker, last_processed_speaker] before each record is yielded.
+        """
+        # Long-running processes pick up edits to the character data file
+        # between pages; this is one stat call when nothing changed
+        reload_character_maps()
         ship_context = self._get_ship_context(title)
-        cleaned_lines = []
-        lines = wikitext.splitlines()
-        line_number = 1
-        last_setting_speaker = ""
-        last_processed_speaker = ""
 
-        for original_line in lines:
+        # Stage callables are bound once; with a profiler they are swapped for
+        # timed wrappers, so an unprofiled run executes exactly the same calls
+        lex_line = self._lex_line
+        resolve_name = resolve_character_name_with_context
+        cleanup_line = self._cleanup_line
+        profiler = self.profiler
+        if profiler is not None:
+            lex_line = profiler.wrap('lex_line', lex_line)
+            resolve_name = profiler.wrap('resolve_character_name', resolve_name)
+            cleanup_line = profiler.wrap('cleanup_line', cleanup_line)
+            perf_counter = time.perf_counter
+        intern_speaker = speakers.intern
+        speaker_ids = speakers.ids
+        scene_codes = SCENE_CODES
+
+        for original_line in line_iterable:
             work_line = original_line.strip()
             if not work_line:
                 continue
 
-            line_with_number = f"-Line {line_number}- "
-            work_line = self._remove_timestamp(work_line)
-            work_line, scene_tag = self._convert_scene_tags(work_line)
-            
-            is_action_line = work_line.startswith('*')
-            
-            work_line, speaker = self._assign_speaker(work_line, ship_context)
+            if profiler is not None:
+                line_start = perf_counter()
+            _, scene_tag, is_action_line, speaker, work_line = lex_line(work_line, ship_context)
             
             if scene_tag == "-Setting-":
                 if '@' in speaker:
@@ -151,71 +283,243 @@ class ContentProcessor:
                 else:
                     final_speaker = last_processed_speaker
             elif raw_speaker_name:
-                final_speaker = resolve_character_name_with_context(raw_speaker_name, ship_context)
+                final_speaker = resolve_name(raw_speaker_name, ship_context)
             else:
                 final_speaker = ""
 
-            work_line = self._cleanup_line(work_line)
-
-            final_line = line_with_number
-            if scene_tag:
-                final_line += f"{scene_tag} "
-            
-            if final_speaker:
-                final_line += f"{final_speaker}: "
-            
-            final_line += work_line
-            cleaned_lines.append(final_line)
+            speaker_id = speaker_ids.get(final_speaker)
+            if speaker_id is None:
+                speaker_id = intern_speaker(final_speaker)
+            record = LogLine(line_number, scene_codes[scene_tag], speaker_id, is_action_line, cleanup_line(work_line))
             line_number += 1
             
             if final_speaker:
                 last_processed_speaker = final_speaker
 
-        return f"**{title}**\n\n" + "\n".join(cleaned_lines)
+            if profiler is not None:
+                profiler.record_line(line_number - 1, original_line, perf_counter() - line_start)
+            if state is not None:
+                state[:] = (last_setting_speaker, last_processed_speaker)
+            yield record
 
-def get_wikitext_from_url(page_url: str) -> Optional[Tuple[str, str]]:
-    """Fetches the raw wikitext of a page from a MediaWiki API."""
+# On-disk revision cache shared by every fetch in this process; see wiki_cache.py.
+# Opened on first use so runs that never touch the network never create it.
+REVISION_CACHE_ENABLED = True
+_revision_cache: Optional['RevisionCache'] = None
+_revision_cache_lock = threading.Lock()
+_revision_cache_settings: Dict[str, object] = {}
+
+def configure_revision_cache(enabled: bool = True, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None) -> None:
+    """Turns the revision cache on or off and sets where and how big it is."""
+    global REVISION_CACHE_ENABLED, _revision_cache
+    REVISION_CACHE_ENABLED = enabled
+    if cache_dir:
+        _revision_cache_settings["cache_dir"] = cache_dir
+    if max_bytes:
+        _revision_cache_settings["max_bytes"] = max_bytes
+    if _revision_cache is not None:
+        _revision_cache.close()
+        _revision_cache = None
+
+def get_revision_cache() -> Optional['RevisionCache']:
+    """Returns the process-wide revision cache, or None when caching is disabled."""
+    global _revision_cache
+    if not REVISION_CACHE_ENABLED:
+        return None
+    with _revision_cache_lock:
+        if _revision_cache is None:
+            import sqlite3
+            from wiki_cache import RevisionCache
+            try:
+                _revision_cache = RevisionCache(**_revision_cache_settings)
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Revision cache unavailable, fetching without it: {e}")
+                configure_revision_cache(enabled=False)
+                return None
+    return _revision_cache
+
+def _log_fetch_stats() -> None:
+    """Logs the network totals if this run talked to a wiki."""
+    if fetch_stats.requests:
+        logging.info(fetch_stats.summary())
+
+def _log_revision_cache_stats() -> None:
+    """Logs the revision cache counters if the cache was used in this run."""
+    if _revision_cache is not None:
+        logging.info(_revision_cache.stats())
+
+# MediaWiki's query API accepts up to 50 titles per request for normal users
+MAX_TITLES_PER_QUERY = 50
+
+# One keep-alive Session per API endpoint (and per thread, since Sessions
+# are not thread-safe), so repeated fetches reuse the same TCP/TLS
+# connection instead of handshaking for every page.
+_session_local = threading.local()
+
+def _get_session(api_url: str) -> 'requests.Session':
+    """Returns this thread's shared Session for an API endpoint."""
+    import requests
+    sessions = getattr(_session_local, 'sessions', None)
+    if sessions is None:
+        sessions = _session_local.sessions = {}
+    session = sessions.get(api_url)
+    if session is None:
+        session = requests.Session()
+        # Wikitext compresses ~5x; requests would ask for this anyway, but be explicit
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
+        sessions[api_url] = session
+    return session
+
+# --- Lean API requests ---
+# Every API call goes through _api_get: the body is read in chunks into one
+# buffer so the wire and decoded byte counts of each request can be added to
+# process-wide totals for the run summary. Parsing is not incremental:
+# json.loads decodes the whole buffer to a str first, so peak memory for a
+# large response is the same as with response.json().
+FETCH_CHUNK_SIZE = 64 * 1024
+
+class FetchStats:
+    """Request count, bytes and time spent on wiki API calls in this process."""
+
+    def __init__(self):
+        self.requests = 0
+        self.wire_bytes = 0
+        self.body_bytes = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, wire_bytes: int, body_bytes: int, seconds: float) -> None:
+        with self._lock:
+            self.requests += 1
+            self.wire_bytes += wire_bytes
+            self.body_bytes += body_bytes
+            self.seconds += seconds
+
+    def summary(self) -> str:
+        saved = 100 * (1 - self.wire_bytes / self.body_bytes) if self.body_bytes else 0.0
+        return (f"Network: {self.requests} API requests, {self.wire_bytes / 1024:,.0f} KiB on the wire "
+                f"({self.body_bytes / 1024:,.0f} KiB decoded, {saved:.0f}% saved by compression), "
+                f"{self.seconds:.1f}s waiting")
+
+fetch_stats = FetchStats()
+
+def _iter_body_chunks(raw) -> Iterator[bytes]:
+    """Yields the decoded body of a streamed response as data arrives."""
+    read1 = getattr(raw, 'read1', None)
+    if read1 is None:
+        # urllib3 1.x: each chunk waits until FETCH_CHUNK_SIZE bytes are in
+        yield from raw.stream(FETCH_CHUNK_SIZE, decode_content=True)
+        return
+    while True:
+        chunk = read1(FETCH_CHUNK_SIZE, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+def _api_get(api_url: str, params: Dict[str, object], timeout: float = 30,
+             expires_at: Optional[float] = None) -> dict:
+    """Runs one API GET and returns the decoded JSON.
+
+    expires_at is a time.perf_counter() value after which the request is
+    given up, even while a slow body is still trickling in. Raises requests
+    exceptions for HTTP and network errors (Timeout when expires_at passes),
+    and ValueError when the body is not JSON.
+    """
+    import requests
+    started = time.perf_counter()
+    if expires_at is not None:
+        remaining = expires_at - started
+        if remaining <= 0:
+            raise requests.exceptions.Timeout(f"Deadline passed before requesting {api_url}")
+        timeout = min(timeout, remaining)
+    with _get_session(api_url).get(api_url, params=params, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        body = bytearray()
+        for chunk in _iter_body_chunks(response.raw):
+            body += chunk
+            if expires_at is not None and time.perf_counter() > expires_at:
+                raise requests.exceptions.Timeout(f"Deadline passed while reading the response from {api_url}")
+        # tell() counts bytes as received, before gzip decoding
+        wire_bytes = response.raw.tell() or len(body)
+    elapsed = time.perf_counter() - started
+    fetch_stats.add(wire_bytes, len(body), elapsed)
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        what = params.get('list') or params.get('prop') or params.get('action')
+        logging.debug(f"GET {api_url} [{what}] {response.status_code} "
+                      f"{response.headers.get('Content-Encoding', 'identity')}: {wire_bytes:,} B on the wire, "
+                      f"{len(body):,} B decoded, {elapsed * 1000:.0f} ms")
     try:
-        # Extract page title from URL
-        # For URLs like https://site.com/wiki/Page_Name, extract Page_Name
-        # For URLs like https://site.com/wiki/2024/09/27_Page, extract 2024/09/27_Page
-        if '/wiki/' in page_url:
-            page_title = page_url.split('/wiki/')[-1]
-        else:
-            page_title = page_url.split('/')[-1]
+        return json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON in API response ({e}): "
+                         f"{bytes(body[:500]).decode('utf-8', 'replace')}...") from e
+
+def _revision_content(revision: dict) -> Optional[str]:
+    """Returns the main-slot wikitext of a revision (also from wikis without slots)."""
+    slots = revision.get('slots')
+    if slots:
+        return slots.get('main', {}).get('content')
+    return revision.get('content')
+
+def _resolve_page_url(page_url: str) -> Tuple[str, str]:
+    """Splits a wiki page URL into (api_url, page_title)."""
+    # Extract page title from URL
+    # For URLs like https://site.com/wiki/Page_Name, extract Page_Name
+    # For URLs like https://site.com/wiki/2024/09/27_Page, extract 2024/09/27_Page
+    if '/wiki/' in page_url:
+        page_title = page_url.split('/wiki/')[-1]
+    else:
+        page_title = page_url.split('/')[-1]
+    
+    # Detect if this is a Fandom wiki and adjust API URL
+    api_url = WIKI_API_URL
+    if 'fandom.com' in page_url and 'wiki.yourdomain.com' in WIKI_API_URL:
+        # Auto-detect Fandom API URL from the page URL
+        # Convert https://sitename.fandom.com/wiki/PageName to https://sitename.fandom.com/api.php
+        base_url = '/'.join(page_url.split('/')[:3])  # Get https://sitename.fandom.com
+        api_url = f"{base_url}/api.php"
+        logging.info(f"Auto-detected Fandom API URL: {api_url}")
+    return api_url, page_title
+
+def get_wikitext_from_url(page_url: str, timeout: float = 30,
+                          deadline: Optional[float] = None) -> Optional[Tuple[str, str]]:
+    """Fetches the raw wikitext of a page from a MediaWiki API.
+
+    timeout bounds each network wait; deadline, if given, bounds the whole
+    fetch in seconds, counted from when this call starts.
+    """
+    import requests
+    expires_at = time.perf_counter() + deadline if deadline is not None else None
+    try:
+        api_url, page_title = _resolve_page_url(page_url)
         
-        # Detect if this is a Fandom wiki and adjust API URL
-        api_url = WIKI_API_URL
-        if 'fandom.com' in page_url and 'wiki.yourdomain.com' in WIKI_API_URL:
-            # Auto-detect Fandom API URL from the page URL
-            # Convert https://sitename.fandom.com/wiki/PageName to https://sitename.fandom.com/api.php
-            base_url = '/'.join(page_url.split('/')[:3])  # Get https://sitename.fandom.com
-            api_url = f"{base_url}/api.php"
-            logging.info(f"Auto-detected Fandom API URL: {api_url}")
+        cache = get_revision_cache()
+        cached = cache.lookup(api_url, page_title) if cache else None
+        if cached:
+            # Cheap check first: only the revision id, not the content
+            current = _query_page_batch(api_url, [page_title], rvprop="ids|timestamp", timeout=timeout,
+                                        expires_at=expires_at).get(page_title)
+            if current and current.get('revid') == cached.revid:
+                logging.info(f"Page '{page_title}' unchanged since revision {cached.revid}; using cached copy")
+                wikitext = cache.hit(api_url, page_title)
+                if wikitext is not None:
+                    return page_title, wikitext
         
         params = {
             "action": "query",
             "format": "json",
             "titles": page_title,
             "prop": "revisions",
-            "rvprop": "content",
+            "rvprop": "ids|timestamp|content",
+            "rvslots": "main",
             "formatversion": 2
         }
         
-        logging.info(f"Fetching from API: {api_url}")
-        logging.info(f"Page title: {page_title}")
-        
-        response = requests.get(api_url, params=params, timeout=30)
-        response.raise_for_status()
-        
-        # Debug: log the response content
-        logging.info(f"Response status: {response.status_code}")
-        logging.info(f"Response content type: {response.headers.get('content-type', 'unknown')}")
-        
+        logging.debug(f"Fetching '{page_title}' from API: {api_url}")
         try:
-            data = response.json()
+            data = _api_get(api_url, params, timeout=timeout, expires_at=expires_at)
         except ValueError as e:
-            logging.error(f"Failed to parse JSON response. Response text: {response.text[:500]}...")
+            logging.error(f"Failed to parse JSON response: {e}")
             return None
             
         if 'query' not in data:
@@ -236,8 +540,14 @@ def get_wikitext_from_url(page_url: str) -> Optional[Tuple[str, str]]:
             logging.error(f"No revisions found for page '{page_title}'")
             return None
             
-        wikitext = page['revisions'][0]['content']
+        revision = page['revisions'][0]
+        wikitext = _revision_content(revision)
+        if wikitext is None:
+            logging.error(f"No content in the latest revision of '{page_title}'")
+            return None
         logging.info(f"Successfully fetched wikitext: {len(wikitext)} characters")
+        if cache:
+            cache.store(api_url, page_title, revision.get('revid', 0), revision.get('timestamp', ''), wikitext)
         return page_title, wikitext
         
     except requests.exceptions.RequestException as e:
@@ -250,6 +560,220 @@ def get_wikitext_from_url(page_url: str) -> Optional[Tuple[str, str]]:
         logging.error(f"Unexpected error fetching URL: {e}")
         return None
 
+def _query_page_batch(api_url: str, titles: List[str], rvprop: str = "ids|timestamp|content",
+                      timeout: float = 30, expires_at: Optional[float] = None) -> Dict[str, Optional[dict]]:
+    """Fetches the latest revision of up to MAX_TITLES_PER_QUERY titles in one query.
+
+    Returns a dict from each requested title to its revision dict (holding
+    the fields asked for in rvprop), or None when the page is missing or has
+    no revisions. Follows the API's `continue` markers when the response is
+    split across several requests.
+    """
+    params = {
+        "action": "query",
+        "format": "json",
+        "titles": "|".join(titles),
+        "prop": "revisions",
+        "rvprop": rvprop,
+        "formatversion": 2
+    }
+    if 'content' in rvprop:
+        params["rvslots"] = "main"
+    aliases = {}
+    revisions = {}
+    continue_params = {}
+    while True:
+        data = _api_get(api_url, {**params, **continue_params}, timeout=timeout, expires_at=expires_at)
+        if 'query' not in data:
+            raise KeyError(f"No 'query' in API response: {data}")
+
+        query = data['query']
+        # Map requested titles onto the titles the wiki actually answers with
+        for mapping in query.get('normalized', []) + query.get('converted', []):
+            aliases[mapping['from']] = mapping['to']
+        for page in query.get('pages', []):
+            if 'missing' in page or 'invalid' in page:
+                revisions.setdefault(page['title'], None)
+            elif page.get('revisions'):
+                revisions[page['title']] = page['revisions'][0]
+
+        if 'continue' not in data:
+            break
+        continue_params = data['continue']
+
+    results = {}
+    for title in titles:
+        resolved_title = title
+        while resolved_title in aliases and aliases[resolved_title] != resolved_title:
+            resolved_title = aliases[resolved_title]
+        results[title] = revisions.get(resolved_title)
+    return results
+
+def fetch_title_batch(api_url: str, titles: List[str]) -> Dict[str, Optional[str]]:
+    """Fetches the wikitext of up to MAX_TITLES_PER_QUERY titles from one API.
+
+    Cached pages whose revision is unchanged are served from the revision
+    cache; the rest come from a single content query. Returns a dict from
+    each title to its wikitext, or None when the page is missing. API and
+    network errors are raised to the caller.
+    """
+    cache = get_revision_cache()
+    fetched: Dict[str, Optional[str]] = {}
+    if cache:
+        # Ask only for revision ids of cached pages; reuse the unchanged ones
+        cached = {title: cache.lookup(api_url, title) for title in titles}
+        cached = {title: entry for title, entry in cached.items() if entry}
+        if cached:
+            current = _query_page_batch(api_url, list(cached), rvprop="ids|timestamp")
+            for title, entry in cached.items():
+                revision = current.get(title)
+                if revision and revision.get('revid') == entry.revid:
+                    wikitext = cache.hit(api_url, title)
+                    if wikitext is not None:
+                        fetched[title] = wikitext
+        titles = [title for title in titles if title not in fetched]
+        if not titles:
+            return fetched
+
+    logging.info(f"Fetching {len(titles)} pages from API: {api_url}")
+    for title, revision in _query_page_batch(api_url, titles).items():
+        wikitext = _revision_content(revision) if revision else None
+        fetched[title] = wikitext
+        if cache and wikitext is not None:
+            cache.store(api_url, title, revision.get('revid', 0), revision.get('timestamp', ''), wikitext)
+    return fetched
+
+def _iter_list_query(api_url: str, list_name: str, params: Dict[str, object],
+                     timeout: float = 30) -> Iterator[dict]:
+    """Yields every entry of a list= query, following the API's `continue` markers."""
+    params = {"action": "query", "format": "json", "formatversion": 2, "list": list_name, **params}
+    continue_params: Dict[str, object] = {}
+    while True:
+        data = _api_get(api_url, {**params, **continue_params}, timeout=timeout)
+        if 'error' in data:
+            raise KeyError(f"API error listing pages: {data['error'].get('info', data['error'])}")
+        if 'query' not in data:
+            raise KeyError(f"No 'query' in API response: {data}")
+        yield from data['query'].get(list_name, [])
+        if 'continue' not in data:
+            break
+        continue_params = data['continue']
+
+def iter_category_titles(category: str, api_url: Optional[str] = None,
+                         namespace: Optional[int] = None) -> Iterator[str]:
+    """Yields the title of every page in a wiki category (not its subcategories or files)."""
+    if not category.lower().startswith('category:'):
+        category = f"Category:{category}"
+    params: Dict[str, object] = {"cmtitle": category, "cmtype": "page", "cmprop": "title", "cmlimit": "max"}
+    if namespace is not None:
+        params["cmnamespace"] = namespace
+    for member in _iter_list_query(api_url or WIKI_API_URL, "categorymembers", params):
+        yield member['title']
+
+def iter_prefix_titles(prefix: str, api_url: Optional[str] = None, namespace: int = 0) -> Iterator[str]:
+    """Yields the title of every page whose title starts with prefix, e.g. '2024/09/27_'."""
+    params = {"apprefix": prefix, "apnamespace": namespace, "aplimit": "max"}
+    for page in _iter_list_query(api_url or WIKI_API_URL, "allpages", params):
+        yield page['title']
+
+def get_wikitext_for_urls(page_urls: Iterable[str]) -> Dict[str, Optional[Tuple[str, str]]]:
+    """Fetches the wikitext of many wiki pages with as few API calls as possible.
+
+    URLs are grouped by API endpoint and sent MAX_TITLES_PER_QUERY titles at
+    a time over a pooled keep-alive Session. Returns a dict keyed by each
+    input URL, in input order, holding (page_title, wikitext) like
+    get_wikitext_from_url, or None when that page could not be fetched.
+    """
+    import requests
+    results: Dict[str, Optional[Tuple[str, str]]] = {}
+    titles_by_api: Dict[str, List[str]] = {}
+    url_targets: Dict[str, Tuple[str, str]] = {}
+    for page_url in page_urls:
+        if page_url in url_targets:
+            continue
+        api_url, page_title = _resolve_page_url(page_url)
+        url_targets[page_url] = (api_url, page_title)
+        results[page_url] = None
+        api_titles = titles_by_api.setdefault(api_url, [])
+        if page_title not in api_titles:
+            api_titles.append(page_title)
+
+    fetched: Dict[Tuple[str, str], Optional[str]] = {}
+    for api_url, titles in titles_by_api.items():
+        for start in range(0, len(titles), MAX_TITLES_PER_QUERY):
+            batch = titles[start:start + MAX_TITLES_PER_QUERY]
+            try:
+                for title, wikitext in fetch_title_batch(api_url, batch).items():
+                    fetched[(api_url, title)] = wikitext
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error fetching batch from {api_url}: {e}")
+            except (KeyError, IndexError, ValueError) as e:
+                logging.error(f"Error parsing wiki API response from {api_url}: {e}")
+
+    for page_url, (api_url, page_title) in url_targets.items():
+        wikitext = fetched.get((api_url, page_title))
+        if wikitext is None:
+            logging.error(f"Page '{page_title}' could not be fetched from the wiki.")
+            continue
+        results[page_url] = (page_title, wikitext)
+    return results
+
+# --- Async fetch engine ---
+# Pages are fetched concurrently on a thread pool driven by asyncio: each API
+# host gets its own in-flight limit, every request has a hard deadline, and
+# results are handed back in completion order so a slow page never holds up
+# the ones that already arrived.
+
+async def _fetch_page_async(executor: 'ThreadPoolExecutor', limit: 'asyncio.Semaphore', page_url: str,
+                            deadline: float) -> Tuple[str, Optional[Tuple[str, str]]]:
+    """Fetches one page on the executor, bounded by its host's semaphore and the deadline."""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    await limit.acquire()
+    # The executor has one thread per host slot, so a fetch starts as soon as
+    # it holds a slot and the deadline below only counts its own run time. The
+    # slot is freed when the thread is really done, not when the deadline
+    # fires; the fetch enforces the same deadline itself and stops soon after.
+    future = loop.run_in_executor(executor, get_wikitext_from_url, page_url, deadline, deadline)
+    future.add_done_callback(lambda _: limit.release())
+    try:
+        result = await asyncio.wait_for(asyncio.shield(future), timeout=deadline)
+    except asyncio.TimeoutError:
+        logging.error(f"Fetching {page_url} exceeded the {deadline}s deadline")
+        result = None
+    return page_url, result
+
+async def iter_wikitext_async(page_urls: Iterable[str], max_per_host: int = 4,
+                              deadline: float = 30) -> AsyncIterator[Tuple[str, Optional[Tuple[str, str]]]]:
+    """Fetches many wiki pages concurrently, yielding (page_url, result) as each finishes.
+
+    At most max_per_host requests are in flight per API host, and any fetch
+    still running deadline seconds after it started yields None for that
+    page. Each result is the (page_title, wikitext) tuple from
+    get_wikitext_from_url.
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    page_urls = list(dict.fromkeys(page_urls))
+    if not page_urls:
+        return
+
+    api_urls = {page_url: _resolve_page_url(page_url)[0] for page_url in page_urls}
+    limits = {api_url: asyncio.Semaphore(max_per_host) for api_url in set(api_urls.values())}
+
+    executor = ThreadPoolExecutor(max_workers=max_per_host * len(limits))
+    try:
+        tasks = [
+            asyncio.ensure_future(_fetch_page_async(executor, limits[api_urls[page_url]], page_url, deadline))
+            for page_url in page_urls
+        ]
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Fetches past their deadline stop on their own shortly; don't wait for them
+        executor.shutdown(wait=False)
+
 def process_file(file_path: str) -> Optional[Tuple[str, str]]:
     """Reads wikitext from a local file."""
     try:
@@ -265,32 +789,907 @@ def process_file(file_path: str) -> Optional[Tuple[str, str]]:
         logging.error(f"Error reading file: {e}")
         return None
 
+# Bytes decoded per step when reading a memory-mapped input. Blocks are cut
+# just after a b'\n', which never occurs inside a multi-byte UTF-8 sequence
+# and never separates a \r\n pair.
+MMAP_BLOCK_SIZE = 4 * 1024 * 1024
+
+def _map_file(file_path: str) -> Optional[mmap.mmap]:
+    """Maps a file read-only; returns None for an empty file, which cannot be mapped."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        # The map keeps its own handle, so the file can be closed right away
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _next_line_start(mapped: mmap.mmap, position: int, limit: int) -> int:
+    """Returns the offset just after the first b'\n' at or after position (or limit)."""
+    cut = mapped.find(b'\n', position, limit)
+    return limit if cut == -1 else cut + 1
+
+def _iter_mapped_range(mapped: mmap.mmap, start: int, stop: int, block_size: int = MMAP_BLOCK_SIZE) -> Iterator[str]:
+    """Yields the lines between two line-start offsets of a mapped file."""
+    while start < stop:
+        end = min(start + block_size, stop)
+        if end < stop:
+            cut = mapped.rfind(b'\n', start, end)
+            # A single line longer than the block extends the block to its end
+            end = cut + 1 if cut != -1 else _next_line_start(mapped, end, stop)
+        # splitlines() keeps the line breaks identical to process_file + splitlines()
+        yield from mapped[start:end].decode('utf-8').splitlines()
+        start = end
+
+def iter_mapped_lines(mapped: mmap.mmap, block_size: int = MMAP_BLOCK_SIZE) -> Iterator[str]:
+    """Yields the lines of a memory-mapped file and closes the map when done.
+
+    Only one block of decoded text exists at a time, so peak memory stays
+    around block_size no matter how large the file is.
+    """
+    with mapped:
+        yield from _iter_mapped_range(mapped, 0, len(mapped), block_size)
+
+def iter_file_lines(file_path: str) -> Iterator[str]:
+    """Yields the lines of a local file without reading it all at once."""
+    try:
+        mapped = _map_file(file_path)
+    except (OSError, ValueError) as e:
+        # Pipes and some network file systems cannot be mapped
+        if not os.path.isfile(file_path):
+            raise
+        logging.debug(f"Memory map unavailable for {file_path} ({e}); reading as text")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for raw_line in f:
+                yield from raw_line.splitlines()
+        return
+    if mapped is not None:
+        yield from iter_mapped_lines(mapped)
+
+def _timed_iter(profiler: StageProfiler, stage: str, iterable: Iterable[str]) -> Iterator[str]:
+    """Yields from iterable, timing the production of each item under stage."""
+    next_item = profiler.wrap(stage, iter(iterable).__next__)
+    while True:
+        try:
+            yield next_item()
+        except StopIteration:
+            return
+
+def write_processed_lines(output_path: str, title: str, processed_lines: Iterable[str],
+                          profiler: Optional[StageProfiler] = None) -> int:
+    """Writes processed lines under the title header as they are produced.
+
+    With a profiler, the writes are timed under 'write_output'.
+    """
+    line_count = 0
+    with AtomicWriter(output_path) as f:
+        write = f.write if profiler is None else profiler.wrap('write_output', f.write)
+        write(f"**{title}**\n\n")
+        for line in processed_lines:
+            if line_count:
+                write("\n")
+            write(line)
+            line_count += 1
+    return line_count
+
+def write_converted(processor: ContentProcessor, output_format: str, output_path: str,
+                    title: str, lines: Iterable[str], source: Optional[str] = None,
+                    profiler: Optional[StageProfiler] = None) -> int:
+    """Converts lines and writes them to output_path in text, jsonl or sqlite format.
+
+    Returns the number of output lines written. With a profiler, pulling the
+    input lines is timed under 'read_input' and the writes under 'write_output'.
+    """
+    if profiler is not None:
+        lines = _timed_iter(profiler, 'read_input', lines)
+    if output_format == 'text':
+        return write_processed_lines(output_path, title, processor.iter_processed_lines(title, lines), profiler)
+    speakers = SpeakerTable()
+    records = processor.iter_line_records(title, lines, speakers)
+    if output_format == 'jsonl':
+        return write_jsonl(output_path, title, records, speakers, profiler)
+    with SqliteExporter(output_path) as database:
+        return database.add_page(title, records, speakers, source, profiler)
+
+# Relative output names resolve against --output-root, then
+# $LOGCONVERT_OUTPUT_DIR, then the program's own directory
+OUTPUT_DIR_ENV = "LOGCONVERT_OUTPUT_DIR"
+_output_root: Optional[str] = None
+
+def set_output_root(path: Optional[str]) -> None:
+    """Sets the directory relative output names are written to (None restores the default)."""
+    global _output_root
+    _output_root = os.path.abspath(os.path.expanduser(path)) if path else None
+
+def get_output_root() -> str:
+    """Returns the directory relative output names are written to."""
+    if _output_root:
+        return _output_root
+    configured = os.environ.get(OUTPUT_DIR_ENV)
+    if configured:
+        return os.path.abspath(os.path.expanduser(configured))
+    if getattr(sys, 'frozen', False):
+        # A PyInstaller one-file build runs from a temporary unpack directory
+        # that is deleted on exit; write next to the executable instead
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.realpath(__file__))
+
+def _get_output_path(output_name: str) -> str:
+    """Resolves an output file or directory name; absolute paths are kept as given."""
+    return os.path.join(get_output_root(), output_name)
+
+def _stream_main(args, profiler: Optional[StageProfiler] = None) -> None:
+    """Runs the --stream mode: read, convert and write line by line."""
+    if args.url:
+        with profile_stage(profiler, 'fetch'):
+            result = get_wikitext_from_url(args.url)
+        if not result or not result[1]:
+            logging.info("No content to process. Exiting.")
+            return
+        title, wikitext = result
+        lines = iter(wikitext.splitlines())
+        source = args.url
+    else:
+        try:
+            if os.path.getsize(args.file) == 0:
+                logging.info("No content to process. Exiting.")
+                return
+        except OSError:
+            logging.error(f"File not found: {args.file}")
+            return
+        title = os.path.splitext(os.path.basename(args.file))[0]
+        lines = iter_file_lines(args.file)
+        source = os.path.abspath(args.file)
+
+    processor = ContentProcessor(profiler=profiler)
+    try:
+        output_path = _get_output_path(args.output)
+        # Reading, converting and writing are interleaved; write_converted times
+        # the reads and writes on their own, and this stage covers the whole run
+        with profile_stage(profiler, 'stream_total'):
+            line_count = write_converted(processor, args.format, output_path, title, lines, source, profiler)
+        logging.info(f"Successfully streamed {line_count} lines and saved to '{output_path}'")
+    except UnicodeDecodeError as e:
+        logging.error(f"Error reading file: {e}")
+    except Exception as e:
+        logging.error(f"Error writing to output file: {e}")
+
+def _parallel_main(args, profiler: Optional[StageProfiler] = None) -> None:
+    """Runs --file --parallel: convert one file on a process pool."""
+    if args.format != 'text':
+        # Chunk reconciliation works on rendered text lines
+        logging.warning(f"--parallel only supports text output; converting to {args.format} sequentially")
+        _stream_main(args, profiler)
+        return
+    try:
+        if os.path.getsize(args.file) == 0:
+            logging.info("No content to process. Exiting.")
+            return
+    except OSError:
+        logging.error(f"File not found: {args.file}")
+        return
+    try:
+        output_path = _get_output_path(args.output)
+        with profile_stage(profiler, 'parallel_convert'):
+            line_count = convert_file_parallel(args.file, output_path, args.workers)
+        logging.info(f"Successfully converted {line_count} lines in parallel and saved to '{output_path}'")
+    except UnicodeDecodeError as e:
+        logging.error(f"Error reading file: {e}")
+    except Exception as e:
+        logging.error(f"Error converting file: {e}")
+
+# --- Batch conversion ---
+BATCH_DATABASE_NAME = "logs" + FORMAT_EXTENSIONS['sqlite']
+# Each pool worker builds one ContentProcessor and reuses it for every file
+# it is handed, so the character maps and patterns are set up once per core.
+_worker_processor: Optional[ContentProcessor] = None
+_worker_format = 'text'
+
+def _init_batch_worker(output_format: str = 'text', fuzzy_threshold: Optional[float] = None) -> None:
+    """Pool initializer: prepares the per-process ContentProcessor."""
+    global _worker_processor, _worker_format
+    if fuzzy_threshold is not None:
+        configure_fuzzy_names(fuzzy_threshold)
+    _worker_processor = ContentProcessor()
+    _worker_format = output_format
+
+def _convert_file_job(job: Tuple[str, str]) -> Tuple[str, bool, str, str]:
+    """Converts one input file to its output path inside a worker.
+
+    Returns (input_path, succeeded, output path or error message, content hash).
+    """
+    input_path, output_path = job
+    processor = _worker_processor or ContentProcessor()
+    content_hash = ""
+    try:
+        # Hashed here so the manifest update costs the main process nothing
+        content_hash = hash_file(input_path)
+        if os.path.getsize(input_path) == 0:
+            return input_path, False, "No content to process", content_hash
+        title = os.path.splitext(os.path.basename(input_path))[0]
+        output_parent = os.path.dirname(output_path)
+        if output_parent:
+            os.makedirs(output_parent, exist_ok=True)
+        write_converted(processor, _worker_format, output_path, title, iter_file_lines(input_path))
+        return input_path, True, output_path, content_hash
+    except Exception as e:
+        return input_path, False, str(e), content_hash
+
+def _convert_file_rows_job(job: Tuple[str, str]) -> Tuple[str, bool, str, str, str, list]:
+    """Converts one input file to database rows inside a worker.
+
+    The single SQLite writer lives in the main process, so the rows are sent
+    back instead of written. Returns (input_path, succeeded, output path or
+    error message, content hash, title, rows).
+    """
+    input_path, output_path = job
+    processor = _worker_processor or ContentProcessor()
+    content_hash = ""
+    try:
+        content_hash = hash_file(input_path)
+        if os.path.getsize(input_path) == 0:
+            return input_path, False, "No content to process", content_hash, "", []
+        title = os.path.splitext(os.path.basename(input_path))[0]
+        speakers = SpeakerTable()
+        rows = list(record_rows(processor.iter_line_records(title, iter_file_lines(input_path), speakers), speakers))
+        return input_path, True, output_path, content_hash, title, rows
+    except Exception as e:
+        return input_path, False, str(e), content_hash, "", []
+
+def collect_batch_jobs(input_dir: str, pattern: str, output_dir: str) -> List[Tuple[str, str]]:
+    """Finds the input files under a directory and pairs each with its output path.
+
+    The output tree mirrors the input tree: input_dir/a/b.txt is written to
+    output_dir/a/b.txt. Files already inside output_dir are ignored so a rerun
+    never picks up its own results.
+    """
+    input_root = os.path.abspath(input_dir)
+    output_root = os.path.abspath(output_dir)
+    jobs = []
+    for input_path in sorted(glob.glob(os.path.join(input_root, pattern), recursive=True)):
+        if not os.path.isfile(input_path):
+            continue
+        if os.path.commonpath([input_path, output_root]) == output_root:
+            continue
+        relative_path = os.path.relpath(input_path, input_root)
+        jobs.append((input_path, os.path.join(output_root, relative_path)))
+    return jobs
+
+def iter_batch_results(jobs: List[Tuple[str, str]], workers: Optional[int] = None, chunksize: int = 1,
+                       output_format: str = 'text') -> Iterator[tuple]:
+    """Converts many files on a process pool, yielding each job's result as it finishes.
+
+    Results are those of _convert_file_job, or of _convert_file_rows_job for sqlite.
+    """
+    job_function = _convert_file_rows_job if output_format == 'sqlite' else _convert_file_job
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        # No point paying for a pool to run a single worker
+        _init_batch_worker(output_format, _fuzzy_threshold)
+        yield from map(job_function, jobs)
+        return
+
+    import multiprocessing
+    with multiprocessing.Pool(processes=workers, initializer=_init_batch_worker,
+                              initargs=(output_format, _fuzzy_threshold)) as pool:
+        yield from pool.imap_unordered(job_function, jobs, chunksize=max(1, chunksize))
+
+def run_batch(jobs: List[Tuple[str, str]], workers: Optional[int] = None, chunksize: int = 1,
+              output_format: str = 'text') -> List[Tuple[str, bool, str, str]]:
+    """Converts many files to text or jsonl on a process pool and returns the per-file results."""
+    results = []
+    for result in iter_batch_results(jobs, workers, chunksize, output_format):
+        results.append(result)
+        _log_batch_result(result)
+    return results
+
+def _load_batch_into_sqlite(jobs: List[Tuple[str, str]], database_path: str, input_root: str,
+                            workers: Optional[int], chunksize: int) -> List[Tuple[str, bool, str, str]]:
+    """Converts files on the pool and loads every page into one database as results arrive."""
+    results = []
+    with SqliteExporter(database_path) as database:
+        for input_path, succeeded, detail, content_hash, title, rows in iter_batch_results(
+                jobs, workers, chunksize, 'sqlite'):
+            if succeeded:
+                database.add_rows(title, rows, source=os.path.relpath(input_path, input_root))
+            result = (input_path, succeeded, detail, content_hash)
+            results.append(result)
+            _log_batch_result(result)
+        logging.info(f"Loaded {database.rows} lines from {database.pages} pages into '{database_path}'")
+    return results
+
+def _log_batch_result(result: Tuple[str, bool, str, str]) -> None:
+    """Logs the outcome of a single batch job."""
+    input_path, succeeded, detail, _ = result
+    if succeeded:
+        logging.info(f"[OK] {input_path} -> {detail}")
+    else:
+        logging.error(f"[FAILED] {input_path}: {detail}")
+
+def _batch_main(args) -> None:
+    """Runs the --input-dir batch mode."""
+    if not os.path.isdir(args.input_dir):
+        logging.error(f"Input directory not found: {args.input_dir}")
+        return
+
+    output_dir = _get_output_path(args.output_dir)
+    jobs = collect_batch_jobs(args.input_dir, args.glob, output_dir)
+    if not jobs:
+        logging.info(f"No files matching '{args.glob}' in '{args.input_dir}'. Exiting.")
+        return
+    if args.format == 'sqlite':
+        # Every page goes into one database
+        database_path = os.path.join(output_dir, BATCH_DATABASE_NAME)
+        jobs = [(input_path, database_path) for input_path, _ in jobs]
+    elif args.format == 'jsonl':
+        jobs = [(input_path, os.path.splitext(output_path)[0] + FORMAT_EXTENSIONS['jsonl'])
+                for input_path, output_path in jobs]
+
+    # Skip inputs already converted with the same content, maps and processor
+    input_root = os.path.abspath(args.input_dir)
+    maps_version = character_maps_version()
+    if _fuzzy_threshold is not None:
+        # Fuzzy matching changes the output, so it is part of what a conversion depends on
+        maps_version += f"+fuzzy{_fuzzy_threshold}"
+    manifest = ConversionManifest(os.path.join(output_dir, MANIFEST_NAME), PROCESSOR_VERSION, maps_version)
+    if not args.force:
+        pending = [job for job in jobs if not manifest.is_current(os.path.relpath(job[0], input_root), *job)]
+        skipped = len(jobs) - len(pending)
+        if skipped:
+            logging.info(f"Skipping {skipped} unchanged files (use --force to reconvert them)")
+        jobs = pending
+    if not jobs:
+        manifest.save()
+        logging.info(f"Everything in '{args.input_dir}' is up to date. Output in '{output_dir}'")
+        return
+
+    logging.info(f"Converting {len(jobs)} files from '{args.input_dir}'...")
+    if args.format == 'sqlite':
+        results = _load_batch_into_sqlite(jobs, jobs[0][1], input_root, args.workers, args.chunksize)
+    else:
+        results = run_batch(jobs, workers=args.workers, chunksize=args.chunksize, output_format=args.format)
+    output_paths = dict(jobs)
+    for input_path, succeeded, _, content_hash in results:
+        key = os.path.relpath(input_path, input_root)
+        if succeeded:
+            manifest.record(key, input_path, output_paths[input_path], content_hash)
+        else:
+            manifest.forget(key, output_paths[input_path])
+    manifest.save()
+
+    failed = [result for result in results if not result[1]]
+    logging.info(f"Batch complete: {len(results) - len(failed)} succeeded, {len(failed)} failed. Output in '{output_dir}'")
+    for input_path, _, detail, _ in failed:
+        logging.info(f"  failed: {input_path}: {detail}")
+
+# --- Parallel single-file conversion ---
+# One huge log is cut into byte ranges at line boundaries and each range is
+# converted on its own core as if it were the start of a log. Line numbers
+# are fixed up front from a parallel count of non-blank lines. Only the
+# speaker state carried across a boundary can still differ, and only until
+# the state inside the chunk stops depending on where the chunk started, so
+# the reconciliation pass replays just those first lines with the real state.
+PARALLEL_MIN_CHUNK_BYTES = 1024 * 1024
+PARALLEL_CHUNKS_PER_WORKER = 4
+
+def _split_mapped_file(mapped: mmap.mmap, chunk_count: int) -> List[Tuple[int, int]]:
+    """Splits a mapped file into about chunk_count byte ranges that begin on line starts."""
+    size = len(mapped)
+    chunk_count = max(1, min(chunk_count, size // PARALLEL_MIN_CHUNK_BYTES))
+    bounds = [0]
+    for index in range(1, chunk_count):
+        cut = _next_line_start(mapped, max(bounds[-1], size * index // chunk_count), size)
+        if bounds[-1] < cut < size:
+            bounds.append(cut)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+def _count_chunk_job(job: Tuple[str, int, int]) -> int:
+    """Counts the lines of a byte range that produce output (the non-blank ones)."""
+    input_path, start, stop = job
+    with _map_file(input_path) as mapped:
+        return sum(1 for line in _iter_mapped_range(mapped, start, stop) if line.strip())
+
+def _convert_chunk_job(job: Tuple[str, str, int, int, int]) -> Tuple[List[str], List[str]]:
+    """Converts one byte range from an empty speaker state; returns (lines, end state)."""
+    input_path, title, start, stop, line_number = job
+    processor = _worker_processor or ContentProcessor()
+    state = ["", ""]
+    with _map_file(input_path) as mapped:
+        lines = list(processor.iter_processed_lines(
+            title, _iter_mapped_range(mapped, start, stop), line_number=line_number, state=state
+        ))
+    return lines, state
+
+def _iter_reconciled_chunks(processor: ContentProcessor, title: str, mapped: mmap.mmap,
+                            chunks: Iterable[Tuple[int, int, int, List[str], List[str]]]) -> Iterator[str]:
+    """Yields the final output lines of converted chunks, in order.
+
+    A chunk whose incoming state is not empty is replayed from that state
+    and, in lockstep, from the empty state its worker used. As soon as the
+    two states agree every later line of the worker output is already
+    correct (a line's output depends only on the line, its number and the
+    state), so the replay stops there.
+    """
+    carried = ["", ""]
+    for start, stop, line_number, lines, end_state in chunks:
+        if carried == ["", ""]:
+            yield from lines
+            carried = end_state
+            continue
+
+        real_state = list(carried)
+        empty_state = ["", ""]
+        real = processor.iter_processed_lines(
+            title, _iter_mapped_range(mapped, start, stop), line_number,
+            real_state[0], real_state[1], state=real_state
+        )
+        empty = processor.iter_processed_lines(
+            title, _iter_mapped_range(mapped, start, stop), line_number, state=empty_state
+        )
+        replayed = 0
+        for real_line, _ in zip(real, empty):
+            yield real_line
+            replayed += 1
+            if real_state == empty_state:
+                yield from lines[replayed:]
+                carried = end_state
+                break
+        else:
+            # Never converged (or no output at all): the replay covered the whole chunk
+            carried = real_state
+
+def convert_file_parallel(input_path: str, output_path: str, workers: Optional[int] = None,
+                          title: Optional[str] = None) -> int:
+    """Converts one file on a process pool; the output is identical to a sequential run.
+
+    Returns the number of output lines written.
+    """
+    title = title or os.path.splitext(os.path.basename(input_path))[0]
+    workers = max(1, workers or os.cpu_count() or 1)
+    mapped = _map_file(input_path)
+    if mapped is None:
+        return write_processed_lines(output_path, title, [])
+    with mapped:
+        ranges = _split_mapped_file(mapped, workers * PARALLEL_CHUNKS_PER_WORKER)
+        if workers == 1 or len(ranges) == 1:
+            # Too small to be worth a pool
+            return write_processed_lines(output_path, title, ContentProcessor().iter_processed_lines(
+                title, _iter_mapped_range(mapped, 0, len(mapped))))
+
+        import multiprocessing
+        with multiprocessing.Pool(processes=min(workers, len(ranges)), initializer=_init_batch_worker,
+                                  initargs=('text', _fuzzy_threshold)) as pool:
+            counts = pool.map(_count_chunk_job, [(input_path, start, stop) for start, stop in ranges])
+            first_numbers = [1]
+            for count in counts[:-1]:
+                first_numbers.append(first_numbers[-1] + count)
+            jobs = [(input_path, title, start, stop, line_number)
+                    for (start, stop), line_number in zip(ranges, first_numbers)]
+            chunks = (
+                (start, stop, line_number, lines, end_state)
+                for (_, _, start, stop, line_number), (lines, end_state)
+                in zip(jobs, pool.imap(_convert_chunk_job, jobs))
+            )
+            return write_processed_lines(output_path, title,
+                                         _iter_reconciled_chunks(ContentProcessor(), title, mapped, chunks))
+
+def _safe_filename(title: str) -> str:
+    """Turns a wiki page title into a file name, e.g. 2024/09/27_Log -> 2024_09_27_Log."""
+    return re.sub(r'[\\/:*?"<>|]+', '_', title).strip() or "untitled"
+
+def _write_url_result(processor: ContentProcessor, output_dir: str, page_url: str,
+                      result: Optional[Tuple[str, str]], output_format: str = 'text',
+                      database: Optional[SqliteExporter] = None) -> bool:
+    """Converts one fetched page into output_dir (or the database) and logs the outcome."""
+    if not result or not result[1]:
+        logging.error(f"[FAILED] {page_url}: no content fetched")
+        return False
+    title, wikitext = result
+    try:
+        if database is not None:
+            speakers = SpeakerTable()
+            database.add_page(title, processor.iter_line_records(title, wikitext.splitlines(), speakers),
+                              speakers, source=page_url)
+            output_path = database.path
+        elif output_format == 'jsonl':
+            output_path = os.path.join(output_dir, f"{_safe_filename(title)}{FORMAT_EXTENSIONS['jsonl']}")
+            write_converted(processor, output_format, output_path, title, wikitext.splitlines())
+        else:
+            output_path = os.path.join(output_dir, f"{_safe_filename(title)}.txt")
+            with AtomicWriter(output_path) as f:
+                f.write(processor.process_log_content(title, wikitext))
+    except Exception as e:
+        logging.error(f"[FAILED] {page_url}: {e}")
+        return False
+    logging.info(f"[OK] {page_url} -> {output_path}")
+    return True
+
+async def _convert_urls_async(processor: ContentProcessor, output_dir: str, page_urls: List[str],
+                              max_per_host: int, deadline: float, output_format: str = 'text',
+                              database: Optional[SqliteExporter] = None) -> int:
+    """Converts each page as soon as it arrives while the rest are still downloading."""
+    succeeded = 0
+    async for page_url, result in iter_wikitext_async(page_urls, max_per_host, deadline):
+        if _write_url_result(processor, output_dir, page_url, result, output_format, database):
+            succeeded += 1
+    return succeeded
+
+def _url_list_main(args) -> None:
+    """Runs the --url-list mode: fetch many pages and convert each one."""
+    try:
+        with open(args.url_list, 'r', encoding='utf-8') as f:
+            page_urls = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    except OSError as e:
+        logging.error(f"Error reading URL list: {e}")
+        return
+    if not page_urls:
+        logging.info("No URLs to process. Exiting.")
+        return
+
+    output_dir = _get_output_path(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    processor = ContentProcessor()
+    database = SqliteExporter(os.path.join(output_dir, BATCH_DATABASE_NAME)) if args.format == 'sqlite' else None
+    try:
+        if args.concurrency:
+            import asyncio
+            loop = asyncio.new_event_loop()
+            try:
+                succeeded = loop.run_until_complete(_convert_urls_async(
+                    processor, output_dir, page_urls, args.concurrency, args.deadline, args.format, database
+                ))
+            finally:
+                loop.close()
+        else:
+            succeeded = 0
+            for page_url, result in get_wikitext_for_urls(page_urls).items():
+                if _write_url_result(processor, output_dir, page_url, result, args.format, database):
+                    succeeded += 1
+    finally:
+        if database is not None:
+            database.close()
+    logging.info(f"URL list complete: {succeeded} succeeded, {len(page_urls) - succeeded} failed. Output in '{output_dir}'")
+
+# --- Category and prefix crawl ---
+# The page list is enumerated lazily and fed through a pipeline: titles are
+# fetched in MAX_TITLES_PER_QUERY batches on several threads, converted on
+# one thread and written on another. Bounded queues between the stages let
+# all three run at once while keeping memory flat for categories of any size.
+CRAWL_FETCH_WORKERS = 4
+CRAWL_QUEUE_SIZE = 8
+
+def _iter_title_batches(titles: Iterable[str], batch_size: int = MAX_TITLES_PER_QUERY) -> Iterator[List[str]]:
+    """Groups titles into lists of up to batch_size for one API query each."""
+    batch: List[str] = []
+    for title in titles:
+        batch.append(title)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def crawl_pages(titles: Iterable[str], output_dir: str, output_format: str = 'text',
+                fetch_workers: int = CRAWL_FETCH_WORKERS,
+                api_url: Optional[str] = None) -> Tuple[int, List['StageStats']]:
+    """Fetches, converts and writes every listed page, with the three stages running concurrently.
+
+    Returns the number of pages written and the counters of each stage.
+    """
+    from pipeline import Pipeline
+    api_url = api_url or WIKI_API_URL
+    os.makedirs(output_dir, exist_ok=True)
+    processor = ContentProcessor()
+    database = SqliteExporter(os.path.join(output_dir, BATCH_DATABASE_NAME)) if output_format == 'sqlite' else None
+    written = [0]
+
+    def fetch(batch: List[str]) -> Iterator[Tuple[str, str]]:
+        for title, wikitext in fetch_title_batch(api_url, batch).items():
+            if wikitext:
+                yield title, wikitext
+            else:
+                logging.error(f"[FAILED] {title}: no content fetched")
+
+    def convert(page: Tuple[str, str]) -> List[Tuple[str, object]]:
+        title, wikitext = page
+        if output_format == 'text':
+            return [(title, processor.process_log_content(title, wikitext))]
+        speakers = SpeakerTable()
+        records = processor.iter_line_records(title, wikitext.splitlines(), speakers)
+        return [(title, list(record_rows(records, speakers)))]
+
+    def write(converted: Tuple[str, object]) -> None:
+        title, content = converted
+        if database is not None:
+            database.add_rows(title, content, source=title)
+            output_path = database.path
+        else:
+            output_path = os.path.join(output_dir, _safe_filename(title) + FORMAT_EXTENSIONS[output_format])
+            if output_format == 'jsonl':
+                write_jsonl_rows(output_path, title, content)
+            else:
+                with AtomicWriter(output_path) as f:
+                    f.write(content)
+        written[0] += 1
+        logging.info(f"[OK] {title} -> {output_path}")
+
+    pipeline = (Pipeline(queue_size=CRAWL_QUEUE_SIZE)
+                .add_stage("fetch", fetch, workers=fetch_workers)
+                .add_stage("convert", convert)
+                .add_stage("write", write))
+    try:
+        stats = pipeline.run(_iter_title_batches(titles), source_name="list")
+    finally:
+        if database is not None:
+            database.close()
+    return written[0], stats
+
+def _crawl_main(args) -> None:
+    """Runs the --category / --prefix crawl mode."""
+    if args.category:
+        source = f"category '{args.category}'"
+        titles = iter_category_titles(args.category, namespace=args.namespace)
+    else:
+        source = f"pages starting with '{args.prefix}'"
+        titles = iter_prefix_titles(args.prefix, namespace=args.namespace or 0)
+
+    listed = [0]
+
+    def count_titles(titles: Iterable[str]) -> Iterator[str]:
+        for title in titles:
+            listed[0] += 1
+            yield title
+
+    output_dir = _get_output_path(args.output_dir)
+    logging.info(f"Crawling {source} from {WIKI_API_URL}...")
+    written, stats = crawl_pages(count_titles(titles), output_dir, args.format,
+                                 fetch_workers=args.concurrency or CRAWL_FETCH_WORKERS)
+    logging.info("Pipeline stages (list hands out batches of titles; the other stages count pages):")
+    for stage in stats:
+        logging.info(f"  {stage.summary()}")
+    logging.info(f"Crawl complete: {listed[0]} pages listed, {written} written, "
+                 f"{listed[0] - written} failed. Output in '{output_dir}'")
+
+# --- XML dump conversion ---
+# Pages are streamed out of the dump (see wiki_dump.py) on a thread of the
+# main process and converted on the worker pool. A semaphore caps the pages
+# handed out but not yet finished, so a fast reader never queues up the
+# whole dump in memory while the workers catch up.
+DUMP_PAGES_IN_FLIGHT_PER_WORKER = 4
+DUMP_PROGRESS_EVERY = 1000
+
+def _convert_page_job(job: Tuple[str, str, str]) -> Tuple[str, bool, str, list]:
+    """Converts one dump page inside a worker.
+
+    Text and jsonl output is written to the job's output path; for sqlite the
+    rows are returned for the main process to store. Returns (title,
+    succeeded, output path or error message, rows).
+    """
+    title, wikitext, output_path = job
+    processor = _worker_processor or ContentProcessor()
+    try:
+        if _worker_format == 'sqlite':
+            speakers = SpeakerTable()
+            records = processor.iter_line_records(title, wikitext.splitlines(), speakers)
+            return title, True, output_path, list(record_rows(records, speakers))
+        if _worker_format == 'jsonl':
+            write_converted(processor, _worker_format, output_path, title, wikitext.splitlines())
+        else:
+            with AtomicWriter(output_path) as f:
+                f.write(processor.process_log_content(title, wikitext))
+        return title, True, output_path, []
+    except Exception as e:
+        return title, False, str(e), []
+
+def _dump_main(args) -> None:
+    """Runs the --dump mode: convert the pages of a MediaWiki XML dump on a process pool."""
+    from wiki_dump import iter_dump_pages
+    if not os.path.isfile(args.dump):
+        logging.error(f"Dump file not found: {args.dump}")
+        return
+
+    output_dir = _get_output_path(args.output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    database_path = os.path.join(output_dir, BATCH_DATABASE_NAME)
+    extension = FORMAT_EXTENSIONS[args.format]
+    namespaces = None if args.namespace is None else {args.namespace}
+    workers = max(1, args.workers or os.cpu_count() or 1)
+    in_flight = threading.BoundedSemaphore(workers * DUMP_PAGES_IN_FLIGHT_PER_WORKER)
+
+    read_errors: List[Exception] = []
+
+    def iter_jobs() -> Iterator[Tuple[str, str, str]]:
+        try:
+            for title, _, wikitext in iter_dump_pages(args.dump, args.title_pattern, namespaces):
+                in_flight.acquire()
+                output_path = database_path if args.format == 'sqlite' else \
+                    os.path.join(output_dir, _safe_filename(title) + extension)
+                yield title, wikitext, output_path
+        except (ValueError, OSError, EOFError) as e:
+            # End the jobs normally: an exception escaping into imap_unordered
+            # would take over the result slot of a page already handed out
+            read_errors.append(e)
+
+    logging.info(f"Converting pages from dump '{args.dump}' on {workers} worker(s)...")
+    succeeded, failed = 0, []
+    pool = None
+    database = SqliteExporter(database_path) if args.format == 'sqlite' else None
+    try:
+        if workers == 1:
+            _init_batch_worker(args.format, _fuzzy_threshold)
+            results = map(_convert_page_job, iter_jobs())
+        else:
+            import multiprocessing
+            pool = multiprocessing.Pool(processes=workers, initializer=_init_batch_worker,
+                                        initargs=(args.format, _fuzzy_threshold))
+            results = pool.imap_unordered(_convert_page_job, iter_jobs())
+        for title, ok, detail, rows in results:
+            in_flight.release()
+            if not ok:
+                failed.append(title)
+                logging.error(f"[FAILED] {title}: {detail}")
+                continue
+            if database is not None:
+                database.add_rows(title, rows, source=title)
+            succeeded += 1
+            if not succeeded % DUMP_PROGRESS_EVERY:
+                logging.info(f"Converted {succeeded} pages...")
+        for e in read_errors:
+            logging.error(f"Error reading dump '{args.dump}': {e}")
+    except (ValueError, OSError, EOFError) as e:
+        logging.error(f"Error converting dump '{args.dump}': {e}")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if database is not None:
+            database.close()
+    logging.info(f"Dump complete: {succeeded} pages converted, {len(failed)} failed. Output in '{output_dir}'")
+
 def main():
     """Main execution function."""
     parser = argparse.ArgumentParser(
-        description="Process a wiki log file from a URL or a local file.",
+        description="Process a wiki log file from a URL, a local file or a directory of files.",
         formatter_class=argparse.RawTextHelpFormatter
     )
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--url", help="The full URL of the wiki log page.")
     group.add_argument("--file", help="The path to a local .txt file containing the log wikitext.")
-    parser.add_argument("--output", help="The name of the output file.", default="processed_log.txt")
+    group.add_argument("--input-dir", help="Convert every matching file under this directory on a process pool.")
+    group.add_argument("--url-list", help="A text file with one wiki page URL per line; pages are fetched in batches.")
+    group.add_argument("--category", help="Convert every page in this wiki category (e.g. 'Stardancer logs').")
+    group.add_argument("--prefix", help="Convert every page whose title starts with this prefix (e.g. '2024/09/').")
+    group.add_argument("--dump", help="Convert the pages of a MediaWiki XML dump or Special:Export file\n"
+                                      "(.xml, .xml.bz2 or .xml.gz) offline on a process pool.")
+    parser.add_argument("--output", help="The name of the output file (default: processed_log.txt,\n"
+                                         "or .jsonl/.sqlite3 for the other formats).", default=None)
+    parser.add_argument("--output-root", default=None,
+                        help="Directory that relative --output and --output-dir names are written to\n"
+                             f"(default: ${OUTPUT_DIR_ENV}, else the program's own directory).\n"
+                             "Outputs are replaced atomically, and left untouched when unchanged.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default='text',
+                        help="Output format (default: text):\n"
+                             "  text   the classic '-Line N- -Scene A- Speaker: text' file\n"
+                             "  jsonl  one JSON object per line\n"
+                             "  sqlite one row per line in a SQLite database; batch and URL-list\n"
+                             "         runs load every page into <output-dir>/logs.sqlite3")
+    parser.add_argument("--stream", action="store_true",
+                        help="Convert and write a fetched --url page line by line instead of building\n"
+                             "the whole output in memory. --file inputs are always streamed from a\n"
+                             "memory-mapped file, so memory stays flat for any file size.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Split one large --file into chunks and convert them on several processes\n"
+                             "(see --workers). The output is identical to a normal run.")
+    parser.add_argument("--fuzzy-names", nargs='?', type=float, const=DEFAULT_FUZZY_THRESHOLD, default=None,
+                        metavar="THRESHOLD",
+                        help="Match mistyped speaker names (e.g. 'Tolenaa') to the closest known\n"
+                             "character of the page's ship when no alias matches exactly. The optional\n"
+                             f"similarity threshold is between 0 and 1 (default: {DEFAULT_FUZZY_THRESHOLD}).")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Log debug details, including bytes and latency of every wiki API request.")
+    parser.add_argument("--profile", nargs='?', const='table', choices=['table', 'json'],
+                        help="Print per-stage timings and the slowest lines after a --file/--url run.")
+    
+    batch_group = parser.add_argument_group("batch options (with --input-dir, --url-list, --category, --prefix or --dump)")
+    batch_group.add_argument("--glob", default="**/*.txt",
+                             help="File pattern relative to --input-dir (default: **/*.txt).")
+    batch_group.add_argument("--output-dir", default="processed_logs",
+                             help="Directory for converted files; mirrors the input layout (default: processed_logs).")
+    batch_group.add_argument("--workers", type=int, default=None,
+                             help="Number of worker processes for --input-dir, --dump and --parallel\n"
+                                  "(default: number of CPU cores).")
+    batch_group.add_argument("--chunksize", type=int, default=1,
+                             help="Files handed to a worker at a time (default: 1).")
+    batch_group.add_argument("--force", action="store_true",
+                             help="Reconvert every input, even those the manifest says are unchanged.")
+    batch_group.add_argument("--concurrency", type=int, default=0,
+                             help="With --url-list, fetch pages one by one with this many requests\n"
+                                  "in flight per wiki host, converting each as it arrives. With\n"
+                                  f"--category or --prefix, the number of fetch threads (default: {CRAWL_FETCH_WORKERS}).")
+    batch_group.add_argument("--namespace", type=int, default=None,
+                             help="With --category, --prefix or --dump, only take pages in this namespace\n"
+                                  "number (default: any namespace, or 0 (main) for --prefix).")
+    batch_group.add_argument("--title-pattern", default=None,
+                             help="With --dump, only convert pages whose title matches this pattern\n"
+                                  "(e.g. '2024/09/*' or '*Stardancer*').")
+    batch_group.add_argument("--deadline", type=float, default=30,
+                             help="Seconds before a single page fetch is abandoned (default: 30).")
+
+    cache_group = parser.add_argument_group("revision cache (with --url, --url-list, --category or --prefix)")
+    cache_group.add_argument("--no-cache", action="store_true",
+                             help="Always download page content instead of reusing unchanged cached pages.")
+    cache_group.add_argument("--cache-dir", default=None,
+                             help="Where cached wikitext is kept\n"
+                                  "(default: $LOGCONVERT_CACHE_DIR or ~/.cache/logconvert).")
+    cache_group.add_argument("--cache-size-mb", type=int, default=None,
+                             help="Size cap for the cache; least recently used pages are evicted\n"
+                                  "(default: 256).")
     
     args = parser.parse_args()
+    if args.output is None:
+        args.output = "processed_log" + FORMAT_EXTENSIONS[args.format]
+    set_output_root(args.output_root)
+    configure_logging(logging.DEBUG if args.verbose else logging.INFO)
+    if args.fuzzy_names is not None and not 0 < args.fuzzy_names <= 1:
+        parser.error("--fuzzy-names threshold must be between 0 and 1")
+    if args.fuzzy_names is not None:
+        configure_fuzzy_names(args.fuzzy_names)
+
+    configure_revision_cache(
+        enabled=not args.no_cache,
+        cache_dir=args.cache_dir,
+        max_bytes=args.cache_size_mb * 1024 * 1024 if args.cache_size_mb else None
+    )
+    try:
+        _run(args)
+    finally:
+        _log_revision_cache_stats()
+        _log_fetch_stats()
+
+def _run(args) -> None:
+    """Dispatches the parsed command line to the selected mode."""
+    if args.input_dir:
+        _batch_main(args)
+        return
+
+    if args.dump:
+        _dump_main(args)
+        return
+
+    if (args.url or args.url_list or args.category or args.prefix) and 'wiki.yourdomain.com' in WIKI_API_URL:
+        logging.error("Please configure the WIKI_API_URL in the script before using the --url option.")
+        return
+
+    if args.url_list:
+        _url_list_main(args)
+        return
+
+    if args.category or args.prefix:
+        _crawl_main(args)
+        return
+
+    profiler = StageProfiler() if args.profile else None
+    try:
+        _convert_single(args, profiler)
+    finally:
+        if profiler is not None:
+            print(profiler.report_json() if args.profile == 'json' else profiler.report_table())
+
+def _convert_single(args, profiler: Optional[StageProfiler]) -> None:
+    """Converts a single --url or --file input."""
+    if args.parallel and args.file:
+        _parallel_main(args, profiler)
+        return
+    if args.stream or args.file:
+        # Files are always streamed from a memory map; see iter_file_lines
+        _stream_main(args, profiler)
+        return
 
     title = ""
     wikitext = ""
 
     if args.url:
-        if 'wiki.yourdomain.com' in WIKI_API_URL:
-            logging.error("Please configure the WIKI_API_URL in the script before using the --url option.")
-            return
-            
-        result = get_wikitext_from_url(args.url)
-        if result:
-            title, wikitext = result
-    elif args.file:
-        result = process_file(args.file)
+        with profile_stage(profiler, 'fetch'):
+            result = get_wikitext_from_url(args.url)
         if result:
             title, wikitext = result
 
@@ -298,18 +1697,22 @@ def main():
         logging.info("No content to process. Exiting.")
         return
 
-    processor = ContentProcessor()
-    processed_content = processor.process_log_content(title, wikitext)
+    processor = ContentProcessor(profiler=profiler)
+    with profile_stage(profiler, 'process_log_content'):
+        processed_content = processor.process_log_content(title, wikitext)
     
     try:
-        # Save the output in the same directory as the script
-        script_dir = os.path.dirname(os.path.realpath(__file__))
-        output_path = os.path.join(script_dir, args.output)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(processed_content)
+        # Relative names go under --output-root, $LOGCONVERT_OUTPUT_DIR or the program directory
+        output_path = _get_output_path(args.output)
+        with profile_stage(profiler, 'write_output'):
+            with AtomicWriter(output_path) as f:
+                f.write(processed_content)
         logging.info(f"Successfully processed content and saved to '{output_path}'")
     except Exception as e:
         logging.error(f"Error writing to output file: {e}")
 
 if __name__ == "__main__":
+    # Needed for the process pool under a PyInstaller one-file build
+    import multiprocessing
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Structured Exports
+==================
+
+Writers for the non-text output formats, built on the LogLine records from
+line_records.py:
+
+- jsonl:  one JSON object per line, next to where the text file would go
+- sqlite: one row per line in a `lines` table, with a `pages` table and a
+          `log_lines` view that joins the two for ad-hoc queries
+
+The SQLite loader inserts with executemany in large batches inside a single
+WAL transaction. When it starts on an empty database it also drops the
+secondary indexes and builds them once at the end, which is much faster
+than updating them row by row.
+"""
+
+import json
+import os
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+
+from line_records import LogLine, SpeakerTable
+from output_files import AtomicWriter
+
+if TYPE_CHECKING:
+    from profiler import StageProfiler
+
+OUTPUT_FORMATS = ('text', 'jsonl', 'sqlite')
+FORMAT_EXTENSIONS = {'text': '.txt', 'jsonl': '.jsonl', 'sqlite': '.sqlite3'}
+
+# (line_number, scene, speaker, is_action, text) with "" stored as NULL
+Row = Tuple[int, Optional[str], Optional[str], int, str]
+
+def record_rows(records: Iterable[LogLine], speakers: SpeakerTable) -> Iterator[Row]:
+    """Flattens records into plain tuples, ready for pickling or executemany."""
+    names = speakers.names
+    for record in records:
+        yield (record.line_number, record.scene or None, names[record.speaker_id] or None,
+               int(record.is_action), record.text)
+
+def write_jsonl(output_path: str, title: str, records: Iterable[LogLine], speakers: SpeakerTable,
+                profiler: Optional['StageProfiler'] = None) -> int:
+    """Writes one JSON object per record; returns the number of lines written."""
+    return write_jsonl_rows(output_path, title, record_rows(records, speakers), profiler)
+
+def write_jsonl_rows(output_path: str, title: str, rows: Iterable[Row],
+                     profiler: Optional['StageProfiler'] = None) -> int:
+    """Writes one JSON object per row from record_rows; returns the number of lines written.
+
+    With a profiler, the writes are timed under 'write_output'.
+    """
+    dumps = json.dumps
+    line_count = 0
+    with AtomicWriter(output_path) as f:
+        write = f.write if profiler is None else profiler.wrap('write_output', f.write)
+        for line_number, scene, speaker, is_action, text in rows:
+            write(dumps({'page': title, 'line': line_number, 'scene': scene, 'speaker': speaker,
+                         'action': bool(is_action), 'text': text}, ensure_ascii=False))
+            write("\n")
+            line_count += 1
+    return line_count
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS pages ("
+    " id INTEGER PRIMARY KEY, source TEXT NOT NULL UNIQUE, title TEXT NOT NULL, line_count INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS lines ("
+    " page_id INTEGER NOT NULL, line_number INTEGER NOT NULL, scene TEXT, speaker TEXT,"
+    " is_action INTEGER NOT NULL, text TEXT NOT NULL)",
+    "CREATE VIEW IF NOT EXISTS log_lines AS"
+    " SELECT pages.title AS page, pages.source AS source, lines.line_number, lines.scene,"
+    " lines.speaker, lines.is_action, lines.text"
+    " FROM lines JOIN pages ON pages.id = lines.page_id",
+)
+_INDEXES = {
+    'lines_page': "CREATE INDEX IF NOT EXISTS lines_page ON lines (page_id, line_number)",
+    'lines_speaker': "CREATE INDEX IF NOT EXISTS lines_speaker ON lines (speaker)",
+    'lines_scene': "CREATE INDEX IF NOT EXISTS lines_scene ON lines (page_id, scene)",
+}
+
+class SqliteExporter:
+    """Loads converted pages into a SQLite database in one transaction."""
+
+    BATCH_SIZE = 10000
+
+    def __init__(self, path: str):
+        # Imported here so text-only runs never load sqlite3
+        import sqlite3
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self.pages = 0
+        self.rows = 0
+        # Callers use an exporter from one thread at a time, but not always
+        # the thread that opened it (the crawl pipeline writes from a worker)
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.execute("BEGIN")
+        # A fresh load builds the indexes once at the end instead of maintaining
+        # them per row; an existing database keeps them for the page deletes
+        self._bulk_load = self._conn.execute("SELECT 1 FROM lines LIMIT 1").fetchone() is None
+        if self._bulk_load:
+            for name in _INDEXES:
+                self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def add_rows(self, title: str, rows: Iterable[Row], source: Optional[str] = None,
+                 profiler: Optional['StageProfiler'] = None) -> int:
+        """Replaces a page's rows with the given ones; returns the number of rows stored.
+
+        With a profiler, the batch inserts are timed under 'write_output'.
+        """
+        source = source or title
+        conn = self._conn
+        executemany = conn.executemany if profiler is None else profiler.wrap('write_output', conn.executemany)
+        existing = conn.execute("SELECT id FROM pages WHERE source = ?", (source,)).fetchone()
+        if existing:
+            page_id = existing[0]
+            conn.execute("DELETE FROM lines WHERE page_id = ?", (page_id,))
+            conn.execute("UPDATE pages SET title = ? WHERE id = ?", (title, page_id))
+        else:
+            page_id = conn.execute("INSERT INTO pages (source, title, line_count) VALUES (?, ?, 0)",
+                                   (source, title)).lastrowid
+
+        insert = "INSERT INTO lines VALUES (?, ?, ?, ?, ?, ?)"
+        count = 0
+        batch: List[tuple] = []
+        for row in rows:
+            batch.append((page_id,) + tuple(row))
+            if len(batch) >= self.BATCH_SIZE:
+                executemany(insert, batch)
+                count += len(batch)
+                batch.clear()
+        if batch:
+            executemany(insert, batch)
+            count += len(batch)
+        conn.execute("UPDATE pages SET line_count = ? WHERE id = ?", (count, page_id))
+        self.pages += 1
+        self.rows += count
+        return count
+
+    def add_page(self, title: str, records: Iterable[LogLine], speakers: SpeakerTable,
+                 source: Optional[str] = None, profiler: Optional['StageProfiler'] = None) -> int:
+        """Stores a page's records; returns the number of rows stored."""
+        return self.add_rows(title, record_rows(records, speakers), source, profiler)
+
+    def close(self) -> None:
+        """Builds the indexes, commits and closes the database."""
+        if self._conn is None:
+            return
+        for statement in _INDEXES.values():
+            self._conn.execute(statement)
+        self._conn.execute("COMMIT")
+        self._conn.close()
+        self._conn = None
+
+    def abort(self) -> None:
+        """Rolls back everything loaded by this exporter."""
+        if self._conn is not None:
+            self._conn.execute("ROLLBACK")
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> 'SqliteExporter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,73 @@
+"""
+Atomic Output Files
+===================
+
+Converted files are written to a temporary file next to the target and
+moved into place with one rename, so a reader (or a sync tool, or a file
+watcher) only ever sees the old file or the complete new one. If the new
+content is identical to what is already there, the temporary file is
+discarded instead and the existing file is left untouched: its
+modification time does not change, and reruns do not cause churn
+downstream.
+"""
+
+import logging
+import os
+import threading
+from typing import Optional, TextIO
+
+COMPARE_CHUNK_SIZE = 1024 * 1024
+
+def _same_content(path_a: str, path_b: str) -> bool:
+    """Returns True if both files hold exactly the same bytes."""
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+        with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+            while True:
+                chunk_a = a.read(COMPARE_CHUNK_SIZE)
+                if chunk_a != b.read(COMPARE_CHUNK_SIZE):
+                    return False
+                if not chunk_a:
+                    return True
+    except OSError:
+        return False
+
+class AtomicWriter:
+    """Text output that replaces path on success, and only if the content changed.
+
+    Use as a context manager; it yields the open file. If the block raises,
+    the temporary file is removed and path is not touched. Afterwards,
+    `changed` tells whether path was (re)written.
+    """
+
+    def __init__(self, path: str, encoding: str = 'utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.changed = False
+        self._file: Optional[TextIO] = None
+        self._temp_path: Optional[str] = None
+
+    def __enter__(self) -> TextIO:
+        directory, name = os.path.split(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Same directory as the target, so the final rename never crosses
+        # filesystems. Not mkstemp: its 0600 mode would end up on the output.
+        self._temp_path = os.path.join(directory, f".{name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        self._file = open(self._temp_path, 'w', encoding=self.encoding)
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._file.close()
+            if exc_type is None:
+                if _same_content(self._temp_path, self.path):
+                    logging.debug(f"Output unchanged; left '{self.path}' as is")
+                else:
+                    os.replace(self._temp_path, self.path)
+                    self._temp_path = None
+                    self.changed = True
+        finally:
+            if self._temp_path is not None and os.path.exists(self._temp_path):
+                os.remove(self._temp_path)
+            self._temp_path = None
@@ -0,0 +1,327 @@
+"""
+Virtualized Output Preview
+==========================
+
+Shows a converted log inside the GUI without ever loading the whole file
+into a Tk widget. A background pass records the byte offset of every line,
+where each scene starts and which lines each speaker has; the preview then
+seeks to and reads only the lines that fit in the window, so scrolling,
+jumping and filtering cost the same for a 50-line log as for a 500k-line one.
+"""
+
+import re
+import threading
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from bisect import bisect_left
+from tkinter import ttk
+from typing import Dict, List, Optional, Set, Tuple
+
+from character_maps import known_character_names
+
+# "-Line 12- -Scene A- Speaker: text" as written by ContentProcessor
+_OUTPUT_LINE_RE = re.compile(rb'-Line (\d+)- (?:-Scene (.)- |(-Setting-) )?(?:([^*:\r\n]{1,60}): )?')
+
+def is_emitted_speaker(name: str, known_names: Set[str]) -> bool:
+    """Returns True if name has a form ContentProcessor writes as a speaker.
+
+    The converter only writes full names from the character maps or other
+    names capitalized word by word (Narrator included), so a line whose text
+    merely starts with "note: " is not taken for a speaker's line.
+    """
+    return name in known_names or all(word == word.capitalize() for word in name.split())
+
+ALL_SPEAKERS = "(all speakers)"
+
+class OutputLineIndex:
+    """Line offsets, scene starts and per-speaker line lists of a converted log."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # offsets[i] is where line i starts; the extra last entry is the file size
+        self.offsets = array('Q')
+        self.line_numbers = array('I')
+        self.scenes: List[Tuple[str, int]] = []
+        self.speakers: Dict[str, array] = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def build(self, cancel_event: Optional[threading.Event] = None) -> bool:
+        """Scans the file once; returns False if cancelled part-way."""
+        offsets = self.offsets
+        line_numbers = self.line_numbers
+        speakers: Dict[str, array] = {}
+        # Candidate speaker -> accepted name (or None), so each is checked once
+        emitted: Dict[bytes, Optional[str]] = {}
+        known_names = known_character_names()
+        match_line = _OUTPUT_LINE_RE.match
+        last_scene = None
+        position = 0
+        with open(self.path, 'rb') as f:
+            for index, raw_line in enumerate(f):
+                if cancel_event is not None and not index % 10000 and cancel_event.is_set():
+                    return False
+                offsets.append(position)
+                position += len(raw_line)
+                match = match_line(raw_line)
+                if not match:
+                    line_numbers.append(line_numbers[-1] if line_numbers else 0)
+                    continue
+                line_numbers.append(int(match.group(1)))
+                scene = match.group(2) or match.group(3)
+                if scene and scene != last_scene:
+                    label = "Setting" if scene == b'-Setting-' else f"Scene {scene.decode('utf-8', 'replace')}"
+                    self.scenes.append((label, index))
+                    last_scene = scene
+                candidate = match.group(4)
+                if not candidate:
+                    continue
+                if candidate in emitted:
+                    speaker = emitted[candidate]
+                else:
+                    speaker = candidate.decode('utf-8', 'replace')
+                    if not is_emitted_speaker(speaker, known_names):
+                        speaker = None
+                    emitted[candidate] = speaker
+                if speaker is not None:
+                    rows = speakers.get(speaker)
+                    if rows is None:
+                        rows = speakers[speaker] = array('I')
+                    rows.append(index)
+        offsets.append(position)
+        self.speakers = speakers
+        return True
+
+    def __len__(self) -> int:
+        return max(0, len(self.offsets) - 1)
+
+    def row_for_line_number(self, line_number: int) -> int:
+        """Returns the file row holding "-Line line_number-" (or the next one after it)."""
+        return min(bisect_left(self.line_numbers, line_number), max(0, len(self) - 1))
+
+    def read_rows(self, rows) -> List[str]:
+        """Reads the given file rows, seeking straight to each one."""
+        offsets = self.offsets
+        lines = []
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'rb')
+            for row in rows:
+                self._file.seek(offsets[row])
+                raw = self._file.read(offsets[row + 1] - offsets[row])
+                lines.append(raw.decode('utf-8', 'replace').rstrip('\r\n'))
+        return lines
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+class OutputPreview(ttk.Frame):
+    """Scrollable view over an OutputLineIndex that renders only the visible rows."""
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.index: Optional[OutputLineIndex] = None
+        self.rows = None  # None shows every row; otherwise an array of file rows
+        self.top = 0
+        self._cancel_event: Optional[threading.Event] = None
+        self._create_widgets()
+
+    def _create_widgets(self):
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        toolbar = ttk.Frame(self)
+        toolbar.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        toolbar.columnconfigure(7, weight=1)
+
+        ttk.Label(toolbar, text="Line:").grid(row=0, column=0, padx=(0, 5))
+        self.line_var = tk.StringVar()
+        line_entry = ttk.Entry(toolbar, textvariable=self.line_var, width=8)
+        line_entry.grid(row=0, column=1)
+        line_entry.bind('<Return>', lambda e: self.jump_to_line())
+        ttk.Button(toolbar, text="Go", command=self.jump_to_line, width=4).grid(row=0, column=2, padx=(5, 10))
+
+        ttk.Label(toolbar, text="Scene:").grid(row=0, column=3, padx=(0, 5))
+        self.scene_var = tk.StringVar()
+        self.scene_box = ttk.Combobox(toolbar, textvariable=self.scene_var, state='readonly', width=22)
+        self.scene_box.grid(row=0, column=4, padx=(0, 10))
+        self.scene_box.bind('<<ComboboxSelected>>', lambda e: self.jump_to_scene())
+
+        ttk.Label(toolbar, text="Speaker:").grid(row=0, column=5, padx=(0, 5))
+        self.speaker_var = tk.StringVar(value=ALL_SPEAKERS)
+        self.speaker_box = ttk.Combobox(toolbar, textvariable=self.speaker_var, state='readonly', width=22)
+        self.speaker_box.grid(row=0, column=6)
+        self.speaker_box.bind('<<ComboboxSelected>>', lambda e: self.filter_speaker())
+
+        self.info_var = tk.StringVar()
+        ttk.Label(toolbar, textvariable=self.info_var, anchor=tk.E).grid(row=0, column=7, sticky=(tk.W, tk.E))
+
+        self.text = tk.Text(self, wrap=tk.NONE, state='disabled', cursor='arrow')
+        self._line_height = max(1, tkfont.Font(font=self.text.cget('font')).metrics('linespace'))
+        self.text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.vscroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.vscroll.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        hscroll = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        hscroll.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        self.text.configure(xscrollcommand=hscroll.set)
+
+        # The Text widget never holds more than a screenful, so every scroll
+        # gesture is routed to our own row arithmetic instead of Tk's
+        self.text.bind('<Configure>', lambda e: self.render())
+        self.text.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1, 'units', 3) or 'break')
+        self.text.bind('<Button-4>', lambda e: self.scroll(-1, 'units', 3) or 'break')
+        self.text.bind('<Button-5>', lambda e: self.scroll(1, 'units', 3) or 'break')
+        for key, args in (('<Up>', (-1, 'units')), ('<Down>', (1, 'units')),
+                          ('<Prior>', (-1, 'pages')), ('<Next>', (1, 'pages'))):
+            self.text.bind(key, lambda e, args=args: self.scroll(*args) or 'break')
+        self.text.bind('<Home>', lambda e: self.show_row(0) or 'break')
+        self.text.bind('<End>', lambda e: self.show_row(self._row_count()) or 'break')
+        self.text.bind('<Button-1>', lambda e: self.text.focus_set())
+
+    # --- Loading ---
+    def load(self, path: str) -> None:
+        """Indexes path in the background and shows it once the index is ready."""
+        self.close()
+        self.info_var.set("Indexing...")
+        self._cancel_event = threading.Event()
+        index = OutputLineIndex(path)
+        result = {}
+
+        def build():
+            try:
+                result['ok'] = index.build(self._cancel_event)
+            except OSError as e:
+                result['error'] = e
+
+        worker = threading.Thread(target=build, daemon=True)
+        worker.start()
+        self._wait_for_index(worker, index, result)
+
+    def _wait_for_index(self, worker, index, result):
+        if worker.is_alive():
+            self.after(50, self._wait_for_index, worker, index, result)
+            return
+        if 'error' in result:
+            self.info_var.set(f"Could not read file: {result['error']}")
+            return
+        if not result.get('ok'):
+            return
+        self.index = index
+        self.rows = None
+        self.scene_box['values'] = [f"{label} (row {row + 1:,})" for label, row in index.scenes]
+        speakers = sorted(index.speakers, key=lambda name: (-len(index.speakers[name]), name))
+        self.speaker_box['values'] = [ALL_SPEAKERS] + speakers
+        self.speaker_var.set(ALL_SPEAKERS)
+        self.scene_var.set("")
+        self.show_row(0)
+
+    def close(self) -> None:
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        if self.index is not None:
+            self.index.close()
+        self.index = None
+        self.rows = None
+        self.top = 0
+
+    # --- Navigation ---
+    def _row_count(self) -> int:
+        if self.index is None:
+            return 0
+        return len(self.rows) if self.rows is not None else len(self.index)
+
+    def _visible_rows(self) -> int:
+        return max(1, self.text.winfo_height() // self._line_height)
+
+    def show_row(self, position: int) -> None:
+        """Scrolls so the view starts at the given position within the current rows."""
+        self.top = max(0, min(position, self._row_count() - self._visible_rows()))
+        self.render()
+
+    def scroll(self, amount: int, what: str = 'units', step: int = 1) -> None:
+        step = self._visible_rows() if what == 'pages' else step
+        self.show_row(self.top + amount * step)
+
+    def _on_scrollbar(self, action, amount, what=None):
+        if action == 'moveto':
+            self.show_row(int(float(amount) * self._row_count()))
+        else:
+            self.scroll(int(amount), what)
+
+    def jump_to_line(self) -> None:
+        """Jumps to a "-Line N-" number as printed in the output."""
+        if self.index is None:
+            return
+        try:
+            line_number = int(self.line_var.get().replace(',', '').strip())
+        except ValueError:
+            self.info_var.set("Enter a line number")
+            return
+        self._show_file_row(self.index.row_for_line_number(line_number))
+
+    def jump_to_scene(self) -> None:
+        if self.index is None or self.scene_box.current() < 0:
+            return
+        self._show_file_row(self.index.scenes[self.scene_box.current()][1])
+
+    def _show_file_row(self, row: int) -> None:
+        """Shows a file row, or the first filtered row at or after it."""
+        self.show_row(bisect_left(self.rows, row) if self.rows is not None else row)
+
+    def filter_speaker(self) -> None:
+        if self.index is None:
+            return
+        speaker = self.speaker_var.get()
+        # Keep the view anchored on the row currently at the top
+        if self.rows is None:
+            first_row = self.top
+        else:
+            first_row = self.rows[self.top] if self.top < len(self.rows) else 0
+        self.rows = self.index.speakers.get(speaker) if speaker != ALL_SPEAKERS else None
+        self._show_file_row(first_row)
+
+    # --- Rendering ---
+    def render(self) -> None:
+        """Replaces the Text contents with just the rows that fit on screen."""
+        total = self._row_count()
+        visible = self._visible_rows()
+        end = min(total, self.top + visible)
+        if self.index is not None and total:
+            rows = self.rows[self.top:end] if self.rows is not None else range(self.top, end)
+            lines = self.index.read_rows(rows)
+        else:
+            lines = []
+
+        self.text.configure(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', "\n".join(lines))
+        self.text.configure(state='disabled')
+
+        if total:
+            self.vscroll.set(self.top / total, end / total)
+            scope = f" of {len(self.index):,}" if self.rows is not None else ""
+            self.info_var.set(f"Rows {self.top + 1:,}-{end:,} of {total:,}{scope}")
+        else:
+            self.vscroll.set(0, 1)
+            if self.index is not None:
+                self.info_var.set("No rows")
+
+class OutputPreviewWindow:
+    """Top-level window wrapping an OutputPreview for one output file."""
+
+    def __init__(self, master, path: str):
+        self.window = tk.Toplevel(master)
+        self.window.title(f"Preview - {path}")
+        self.window.geometry("900x600")
+        self.preview = OutputPreview(self.window, padding="10")
+        self.preview.pack(fill=tk.BOTH, expand=True)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.preview.load(path)
+
+    def close(self) -> None:
+        self.preview.close()
+        self.window.destroy()
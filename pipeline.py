@@ -0,0 +1,210 @@
+"""
+Staged Thread Pipeline
+======================
+
+Runs a chain of stages (for example enumerate -> fetch -> convert -> write)
+concurrently, each on its own worker threads, connected by bounded queues.
+A slow stage fills its input queue and makes the stages before it wait
+instead of buffering the whole crawl in memory, while a fast stage simply
+waits for work.
+
+Every stage keeps counters: items taken and produced, errors, time spent
+working, time starved (waiting for input) and time blocked (waiting for room
+downstream). Together they show which stage limits the throughput.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+# Put on a queue once per downstream worker when a stage has finished
+_DONE = object()
+
+class StageStats:
+    """Throughput counters of one pipeline stage."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.started = 0.0
+        self.finished = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, items_in: int = 0, items_out: int = 0, errors: int = 0,
+            busy: float = 0.0, starved: float = 0.0, blocked: float = 0.0) -> None:
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.errors += errors
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+
+    @property
+    def elapsed(self) -> float:
+        return max(0.0, (self.finished or time.perf_counter()) - self.started)
+
+    def summary(self) -> str:
+        elapsed = self.elapsed
+        # The source only produces and the last stage only consumes
+        handled = self.items_out or self.items_in
+        rate = handled / elapsed if elapsed > 0 else 0.0
+        return (f"{self.name}: {self.items_in} in, {self.items_out} out, {self.errors} errors, "
+                f"{rate:.1f}/s over {elapsed:.1f}s on {self.workers} worker(s); "
+                f"busy {self.busy:.1f}s, starved {self.starved:.1f}s, blocked {self.blocked:.1f}s")
+
+class _Stage:
+    def __init__(self, name: str, function: Callable[[object], Optional[Iterable]], workers: int):
+        self.name = name
+        self.function = function
+        self.workers = max(1, workers)
+        self.stats = StageStats(name, self.workers)
+
+class Pipeline:
+    """A source iterable feeding a chain of stages over bounded queues.
+
+    Each stage function takes one item and returns an iterable of items for
+    the next stage (or None for none). The last stage's output is discarded.
+    An exception raised for one item is logged and counted as an error of
+    that stage; the rest of the items keep flowing.
+    """
+
+    def __init__(self, queue_size: int = 16):
+        self.queue_size = queue_size
+        self._stages: List[_Stage] = []
+        self._stop = threading.Event()
+
+    def add_stage(self, name: str, function: Callable[[object], Optional[Iterable]], workers: int = 1) -> 'Pipeline':
+        self._stages.append(_Stage(name, function, workers))
+        return self
+
+    @property
+    def stats(self) -> List[StageStats]:
+        return [stage.stats for stage in self._stages]
+
+    def stop(self) -> None:
+        """Asks every stage to finish after its current item."""
+        self._stop.set()
+
+    def run(self, source: Iterable, source_name: str = "source") -> List[StageStats]:
+        """Runs the pipeline to completion and returns the counters, source stage first."""
+        source_stage = _Stage(source_name, None, 1)
+        stages = [source_stage] + self._stages
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self._stages]
+        threads = [threading.Thread(target=self._run_source, args=(source_stage, source, queues[0]),
+                                    name=f"pipeline-{source_name}", daemon=True)]
+        for position, stage in enumerate(self._stages):
+            output = queues[position + 1] if position + 1 < len(queues) else None
+            downstream = self._stages[position + 1].workers if output is not None else 0
+            remaining = [stage.workers]
+            remaining_lock = threading.Lock()
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._run_worker,
+                    args=(stage, queues[position], output, downstream, remaining, remaining_lock),
+                    name=f"pipeline-{stage.name}-{worker}", daemon=True
+                ))
+
+        start = time.perf_counter()
+        for stage in stages:
+            stage.stats.started = start
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.2)
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+            raise
+        return [stage.stats for stage in stages]
+
+    def _put(self, output: queue.Queue, item, stats: StageStats) -> bool:
+        """Puts item downstream, waiting for room; returns False if the pipeline was stopped."""
+        waited_from = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                output.put(item, timeout=0.2)
+                stats.add(blocked=time.perf_counter() - waited_from)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue, stats: StageStats):
+        waited_from = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                item = source.get(timeout=0.2)
+                stats.add(starved=time.perf_counter() - waited_from)
+                return item
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _run_source(self, stage: _Stage, source: Iterable, output: queue.Queue) -> None:
+        stats = stage.stats
+        perf_counter = time.perf_counter
+        try:
+            iterator = iter(source)
+            while not self._stop.is_set():
+                started = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    stats.add(busy=perf_counter() - started)
+                    break
+                stats.add(items_out=1, busy=perf_counter() - started)
+                if not self._put(output, item, stats):
+                    break
+        except Exception as e:
+            logging.error(f"Pipeline stage '{stage.name}' failed: {e}")
+            stats.add(errors=1)
+        finally:
+            stats.finished = perf_counter()
+            for _ in range(self._stages[0].workers):
+                self._put(output, _DONE, stats)
+
+    def _run_worker(self, stage: _Stage, source: queue.Queue, output: Optional[queue.Queue],
+                    downstream_workers: int, remaining: List[int], remaining_lock: threading.Lock) -> None:
+        stats = stage.stats
+        perf_counter = time.perf_counter
+        try:
+            while True:
+                item = self._get(source, stats)
+                if item is _DONE:
+                    break
+                started = perf_counter()
+                produced = 0
+                try:
+                    results = stage.function(item)
+                    for result in results or ():
+                        produced += 1
+                        if output is not None:
+                            stats.add(busy=perf_counter() - started)
+                            if not self._put(output, result, stats):
+                                return
+                            started = perf_counter()
+                    stats.add(items_in=1, items_out=produced, busy=perf_counter() - started)
+                except Exception as e:
+                    logging.error(f"Pipeline stage '{stage.name}' failed on an item: {e}")
+                    stats.add(items_in=1, items_out=produced, errors=1, busy=perf_counter() - started)
+        finally:
+            with remaining_lock:
+                remaining[0] -= 1
+                last_worker = remaining[0] == 0
+            if last_worker:
+                stats.finished = perf_counter()
+                if output is not None:
+                    for _ in range(downstream_workers):
+                        self._put(output, _DONE, stats)
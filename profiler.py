@@ -0,0 +1,101 @@
+"""
+Per-Stage Profiling for Conversions
+===================================
+
+Optional instrumentation for a conversion run. A StageProfiler records the
+cumulative time and call count of each stage (fetching, reading, lexing,
+speaker resolution, cleanup, writing) and keeps the slowest individual
+lines. Nothing here runs unless a profiler is handed to ContentProcessor or
+enabled with --profile, so normal runs pay nothing for it.
+"""
+
+import heapq
+import json
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+class StageProfiler:
+    """Collects per-stage timings and the slowest lines of a run."""
+
+    def __init__(self, slowest_lines: int = 10):
+        self.totals: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.slowest_lines = slowest_lines
+        self._slowest: List[Tuple[float, int, str]] = []
+
+    def add(self, stage: str, seconds: float, calls: int = 1) -> None:
+        """Adds time spent in a stage."""
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """Returns func instrumented to record its time under stage."""
+        perf_counter = time.perf_counter
+        add = self.add
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add(stage, perf_counter() - start)
+        return timed
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Times the enclosed block as one call of stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def record_line(self, line_number: int, text: str, seconds: float) -> None:
+        """Records one processed line, keeping only the slowest ones."""
+        self.add('line_total', seconds)
+        if len(self._slowest) < self.slowest_lines:
+            heapq.heappush(self._slowest, (seconds, line_number, text[:200]))
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, line_number, text[:200]))
+
+    def report(self) -> dict:
+        """Returns the collected data as a JSON-serialisable dict."""
+        return {
+            'stages': {
+                stage: {
+                    'seconds': self.totals[stage],
+                    'calls': self.calls[stage],
+                    'avg_us': self.totals[stage] / self.calls[stage] * 1e6 if self.calls[stage] else 0.0,
+                }
+                for stage in self.totals
+            },
+            'slowest_lines': [
+                {'line': line_number, 'seconds': seconds, 'text': text[:200]}
+                for seconds, line_number, text in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+    def report_json(self) -> str:
+        return json.dumps(self.report(), indent=2)
+
+    def report_table(self) -> str:
+        """Formats the report as a plain-text table."""
+        data = self.report()
+        rows = [f"{'Stage':<26}{'Calls':>12}{'Total (s)':>12}{'Avg (us)':>12}"]
+        for stage, values in sorted(data['stages'].items(), key=lambda item: -item[1]['seconds']):
+            rows.append(f"{stage:<26}{values['calls']:>12,}{values['seconds']:>12.4f}{values['avg_us']:>12.1f}")
+        if data['slowest_lines']:
+            rows.append("")
+            rows.append("Slowest lines:")
+            for entry in data['slowest_lines']:
+                rows.append(f"  line {entry['line']:>8}  {entry['seconds'] * 1e6:>9.1f} us  {entry['text'][:80]}")
+        return "\n".join(rows)
+
+@contextmanager
+def _no_stage():
+    yield
+
+def profile_stage(profiler: Optional[StageProfiler], stage: str):
+    """Times a block under stage when a profiler is active; otherwise does nothing."""
+    return profiler.stage(stage) if profiler is not None else _no_stage()
@@ -5,7 +5,8 @@ setup(
     version="1.0.0",
     description="A tool for converting wiki log files to formatted text",
     author="Log Converter Team",
-    py_modules=["log_converter", "character_maps"],
+    py_modules=["log_converter", "character_maps", "character_store", "fuzzy_names", "wiki_cache", "conversion_manifest", "profiler", "output_preview", "line_records", "log_export", "pipeline", "wiki_dump", "output_files"],
+    data_files=[("share/logconvert", ["character_maps.json"])],
     install_requires=[
         "requests",
         "beautifulsoup4",
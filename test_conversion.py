@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Conversion regression tests.
+
+Checks that test_log.txt still converts to test_output_fixed.txt, that the
+single-pass lexer agrees with a copy of the original timestamp, scene tag
+and speaker patterns on edge-case and synthetic lines, and that
+convert_file_parallel writes exactly what a sequential run writes.
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+import log_converter
+from benchmarks.generator import iter_log_lines
+from log_converter import ContentProcessor, convert_file_parallel, iter_file_lines, process_file, write_processed_lines
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+EDGE_CASE_LINES = [
+    "[12:30] [DOIC1] T'Pol: This is a test dialogue from the bridge.",
+    "[12:31] [DOIC1] Archer@Captain: Acknowledged, T'Pol.",
+    "[12:32] [DOIC1] *The ship rocks from weapons fire*",
+    "[12:34] [DOIC1] [DOIC End]",
+    "[DOIC] *The corridor is quiet*",
+    "[DOIC] Blaine@Captain: setting narration",
+    "[DOIC7] Unknown scene digit: still a line",
+    "[9:05] Marcus: no scene tag",
+    "[12:30:15] [DOIC2] seconds in the timestamp",
+    "[DOIC3]",
+    "[12:00]",
+    "Some text then [DOIC4] a tag in the middle",
+    "[Tolena] Bracketed speaker with text",
+    "[Tolena]: Bracketed speaker with a colon",
+    "[not a name at all] words",
+    "[DOIC1] [Marcus] bracket after the tag",
+    "DGM@Game: *The lights flicker*",
+    "DGM: The lights flicker",
+    "lowercase: not a speaker",
+    "One two three four five: too many words",
+    "Two Words: is a speaker",
+    "Ship's log: stardate",
+    "x: y",
+    ": empty speaker",
+    "Name:no space after the colon",
+    "Archer@: empty tag",
+    "@Captain: empty name",
+    "***",
+    "*",
+    "''Bold'': and <b>html</b>",
+    "Ünïcödé: name",
+    "[12:30] [DOIC1] Archer@Captain: colon: twice",
+]
+
+# The lexing chain of the converter before the single-pass lexer, with its
+# regexes copied verbatim, so the test does not share code with _lex_line
+_REFERENCE_TIMESTAMP = r'^\s*\[\s*\d{1,2}:\d{2}(?::\d{2})?\s*\]\s*'
+_REFERENCE_DOIC = r'\[\s*(DOIC(\d)?)\s*\]'
+_REFERENCE_SCENES = {'1': 'A', '2': 'B', '3': 'C', '4': 'D', '5': 'E', '6': 'F'}
+_REFERENCE_BRACKET_SPEAKER = r'^\s*\[\s*([^\]]+?)\s*\]'
+_REFERENCE_AT_SPEAKER = r'^\s*([^:]+@\S+)\s*:'
+_REFERENCE_COLON_SPEAKER = r'^\s*([^:]{2,40}?)\s*:'
+
+def _reference_speaker(processor: ContentProcessor, line: str, ship_context: str):
+    bracket_match = re.search(_REFERENCE_BRACKET_SPEAKER, line)
+    if bracket_match and processor._is_known_character(bracket_match.group(1), ship_context):
+        speaker = bracket_match.group(1).strip()
+        line = line[bracket_match.end(0):].lstrip()
+        if line.startswith(':'):
+            line = line[1:].lstrip()
+        return line, speaker
+    at_match = re.search(_REFERENCE_AT_SPEAKER, line)
+    if at_match:
+        return line[at_match.end(0):].lstrip(), at_match.group(1).strip()
+    colon_match = re.search(_REFERENCE_COLON_SPEAKER, line)
+    if colon_match:
+        potential_speaker = colon_match.group(1).strip()
+        if (' ' in potential_speaker or (potential_speaker.isalpha() and potential_speaker[0].isupper())) \
+                and len(potential_speaker.split()) < 5:
+            return line[colon_match.end(0):].lstrip(), potential_speaker
+    return line, ""
+
+def _reference_lex(processor: ContentProcessor, line: str, ship_context: str):
+    """Timestamp removal, scene tag conversion and speaker assignment as the original chain did them."""
+    line = re.sub(_REFERENCE_TIMESTAMP, '', line)
+    scene_tag = ""
+    match = re.search(_REFERENCE_DOIC, line, re.IGNORECASE)
+    if match:
+        digit = match.group(2)
+        scene_tag = f"-Scene {_REFERENCE_SCENES.get(digit, '?')}-" if digit else "-Setting-"
+        line = line.replace(match.group(0), "", 1).lstrip()
+    is_action_line = line.startswith('*')
+    body, speaker = _reference_speaker(processor, line, ship_context)
+    return scene_tag, is_action_line, speaker, body
+
+def test_reference_output():
+    title, content = process_file(os.path.join(HERE, "test_log.txt"))
+    with open(os.path.join(HERE, "test_output_fixed.txt"), 'r', encoding='utf-8') as f:
+        expected = f.read()
+    assert ContentProcessor().process_log_content(title, content) == expected
+
+def test_lexer_matches_reference_chain():
+    processor = ContentProcessor()
+    lines = EDGE_CASE_LINES + list(iter_log_lines(5000, seed=1))
+    for ship_context in ("stardancer", ""):
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            _, scene_tag, is_action_line, speaker, body = processor._lex_line(line, ship_context)
+            assert (scene_tag, is_action_line, speaker, body) == _reference_lex(processor, line, ship_context), \
+                f"lexer differs on {line!r} ({ship_context or 'no ship'})"
+
+def test_parallel_matches_sequential():
+    min_chunk_bytes = log_converter.PARALLEL_MIN_CHUNK_BYTES
+    # Small chunks, so even a test-sized log is split across the workers
+    log_converter.PARALLEL_MIN_CHUNK_BYTES = 4096
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, "USS Stardancer log.txt")
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(iter_log_lines(3000, seed=2)))
+            sequential_path = os.path.join(temp_dir, "sequential.txt")
+            parallel_path = os.path.join(temp_dir, "parallel.txt")
+            title = "USS Stardancer log"
+            write_processed_lines(sequential_path, title,
+                                  ContentProcessor().iter_processed_lines(title, iter_file_lines(input_path)))
+            convert_file_parallel(input_path, parallel_path, workers=3)
+            with open(sequential_path, 'rb') as f:
+                sequential = f.read()
+            with open(parallel_path, 'rb') as f:
+                parallel = f.read()
+    finally:
+        log_converter.PARALLEL_MIN_CHUNK_BYTES = min_chunk_bytes
+    assert parallel == sequential
+
+if __name__ == "__main__":
+    print("Testing conversion...")
+    for test in (test_reference_output, test_lexer_matches_reference_chain, test_parallel_matches_sequential):
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            sys.exit(1)
+    print("Test complete!")
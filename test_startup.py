@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Startup-time regression test for the command-line converter.
+
+Imports log_converter in a fresh interpreter with -X importtime and checks
+that network/database modules stay unloaded and that the cumulative import
+time stays within budget. Override the budget with LOGCONVERT_IMPORT_BUDGET_MS.
+"""
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+IMPORT_BUDGET_MS = float(os.environ.get('LOGCONVERT_IMPORT_BUDGET_MS', '150'))
+LAZY_MODULES = ('requests', 'asyncio', 'sqlite3', 'concurrent.futures', 'multiprocessing')
+
+def _import_times():
+    """Returns {module: cumulative microseconds} for a fresh `import log_converter`."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import log_converter'],
+        cwd=HERE, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+def test_network_modules_not_imported():
+    times = _import_times()
+    loaded = [module for module in LAZY_MODULES if module in times]
+    assert not loaded, f"imported at startup: {', '.join(loaded)}"
+
+def test_import_time_budget():
+    # Warm run first so the measurement uses compiled bytecode
+    _import_times()
+    total_ms = _import_times()['log_converter'] / 1000
+    assert total_ms <= IMPORT_BUDGET_MS, f"import log_converter took {total_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+if __name__ == "__main__":
+    print("Testing startup...")
+    for test in (test_network_modules_not_imported, test_import_time_budget):
+        try:
+            test()
+            print(f"✓ {test.__name__}")
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            sys.exit(1)
+    print("Test complete!")
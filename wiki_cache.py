@@ -0,0 +1,108 @@
+"""
+Revision Cache for Fetched Wikitext
+===================================
+
+Keeps the wikitext of fetched wiki pages on disk together with the revision
+id and timestamp it came from. Later runs only have to ask the wiki for the
+current revision id (a tiny response) and can reuse the stored content when
+the page has not been edited since.
+
+Entries are keyed by API endpoint + page title and evicted least recently
+used first once the stored content exceeds the size cap.
+"""
+
+import os
+import threading
+import time
+from typing import Optional, NamedTuple
+
+DEFAULT_CACHE_DIR = os.environ.get('LOGCONVERT_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'logconvert')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class CachedRevision(NamedTuple):
+    """Which revision of a page is stored; the content itself is read by hit()."""
+    revid: int
+    timestamp: str
+
+class RevisionCache:
+    """SQLite-backed LRU cache of page wikitext keyed by (api_url, title)."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        # Imported here so merely importing this module stays cheap
+        import sqlite3
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'revisions.sqlite3')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS revisions ("
+            " api_url TEXT NOT NULL, title TEXT NOT NULL, revid INTEGER NOT NULL,"
+            " timestamp TEXT NOT NULL, content TEXT NOT NULL, size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL, PRIMARY KEY (api_url, title))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS revisions_last_used ON revisions (last_used)")
+        self._conn.commit()
+
+    def lookup(self, api_url: str, title: str) -> Optional[CachedRevision]:
+        """Returns the stored revision id and timestamp for a page, if any, without its content."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT revid, timestamp FROM revisions WHERE api_url = ? AND title = ?",
+                (api_url, title)
+            ).fetchone()
+        return CachedRevision(*row) if row else None
+
+    def hit(self, api_url: str, title: str) -> Optional[str]:
+        """Marks a stored page as still current and returns its wikitext."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM revisions WHERE api_url = ? AND title = ?", (api_url, title)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE revisions SET last_used = ? WHERE api_url = ? AND title = ?",
+                (time.time(), api_url, title)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return row[0]
+
+    def store(self, api_url: str, title: str, revid: int, timestamp: str, content: str) -> None:
+        """Saves freshly downloaded wikitext and evicts old entries past the size cap."""
+        size = len(content.encode('utf-8'))
+        with self._lock:
+            self.misses += 1
+            if size > self.max_bytes:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO revisions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (api_url, title, revid, timestamp, content, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drops least recently used entries until the cache fits max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM revisions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for api_url, title, size in self._conn.execute(
+                "SELECT api_url, title, size FROM revisions ORDER BY last_used").fetchall():
+            self._conn.execute("DELETE FROM revisions WHERE api_url = ? AND title = ?", (api_url, title))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> str:
+        """Returns a one-line summary of the hit/miss counters."""
+        return f"Revision cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
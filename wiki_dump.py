@@ -0,0 +1,68 @@
+"""
+MediaWiki XML Dump Reader
+=========================
+
+Streams pages out of a Special:Export file or a full XML dump, optionally
+compressed with bzip2 or gzip, without loading it into memory. The XML is
+parsed incrementally; every finished <revision> is emptied once its text has
+been taken and every finished <page> is dropped from the tree, so memory
+stays at roughly one revision no matter how large the dump is, even for
+history dumps with thousands of revisions per page.
+"""
+
+import bz2
+import fnmatch
+import gzip
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Collection, Iterator, Optional, Tuple
+
+def open_dump(path: str) -> BinaryIO:
+    """Opens a dump for reading, decompressing .bz2 and .gz files on the fly."""
+    lowered = path.lower()
+    if lowered.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if lowered.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def iter_dump_pages(path: str, title_pattern: Optional[str] = None,
+                    namespaces: Optional[Collection[int]] = None) -> Iterator[Tuple[str, int, str]]:
+    """Yields (title, namespace, wikitext) for each page of a dump.
+
+    Redirects and pages without text are skipped. title_pattern is a
+    shell-style pattern such as '2024/09/*' matched against the full title;
+    namespaces limits the pages to those namespace numbers. When a page has
+    several revisions (an export with history), the last one is used.
+    Raises ValueError if the XML is malformed or truncated.
+    """
+    with open_dump(path) as f:
+        context = ET.iterparse(f, events=('start', 'end'))
+        try:
+            _, root = next(context)
+            title, namespace, text, redirect = "", 0, None, False
+            for event, element in context:
+                if event != 'end':
+                    continue
+                # Tags carry the export schema namespace, e.g. {http://www.mediawiki.org/xml/export-0.11/}page
+                tag = element.tag.rpartition('}')[2]
+                if tag == 'title':
+                    title = element.text or ""
+                elif tag == 'ns':
+                    namespace = int(element.text or 0)
+                elif tag == 'redirect':
+                    redirect = True
+                elif tag == 'text':
+                    text = element.text
+                elif tag == 'revision':
+                    # Only the latest text is kept; drop this revision's subtree
+                    element.clear()
+                elif tag == 'page':
+                    if (text and not redirect
+                            and (namespaces is None or namespace in namespaces)
+                            and (title_pattern is None or fnmatch.fnmatchcase(title, title_pattern))):
+                        yield title, namespace, text
+                    title, namespace, text, redirect = "", 0, None, False
+                    # Drop every finished element so the tree never grows
+                    root.clear()
+        except ET.ParseError as e:
+            raise ValueError(f"Malformed dump XML: {e}") from e